@@ -642,15 +642,12 @@ class AccessGrantsTable:
                     result = await Users.get_users(filter={'roles': ['!pending']}, db=db)
                     return result.get('users', [])
 
-            user_ids_with_access = set()
+            user_ids_with_access = {grant.principal_id for grant in grants if grant.principal_type == 'user'}
 
-            for grant in grants:
-                if grant.principal_type == 'user':
-                    user_ids_with_access.add(grant.principal_id)
-                elif grant.principal_type == 'group':
-                    group_user_ids = await Groups.get_group_user_ids_by_id(grant.principal_id, db=db)
-                    if group_user_ids:
-                        user_ids_with_access.update(group_user_ids)
+            group_ids = [grant.principal_id for grant in grants if grant.principal_type == 'group']
+            if group_ids:
+                for group_user_ids in (await Groups.get_group_user_ids_by_ids(group_ids, db=db)).values():
+                    user_ids_with_access.update(group_user_ids)
 
             if not user_ids_with_access:
                 return []
@@ -286,9 +286,9 @@ class ChannelTable:
         users = set(user_ids or [])
         users.add(invited_by)
 
-        for group_id in group_ids or []:
-            group_user_ids = await Groups.get_group_user_ids_by_id(group_id)
-            users.update(group_user_ids)
+        if group_ids:
+            for group_user_ids in (await Groups.get_group_user_ids_by_ids(group_ids)).values():
+                users.update(group_user_ids)
 
         return users
 
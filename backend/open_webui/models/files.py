@@ -123,6 +123,7 @@ class FileUpdateForm(BaseModel):
     hash: Optional[str] = None
     data: Optional[dict] = None
     meta: Optional[dict] = None
+    path: Optional[str] = None
 
 
 class FilesTable:
@@ -137,12 +138,13 @@ class FilesTable:
             if file_data.get('meta'):
                 file_data['meta'] = sanitize_metadata(file_data['meta'])
 
+            now = int(time.time())
             file = FileModel(
                 **{
                     **file_data,
                     'user_id': user_id,
-                    'created_at': int(time.time()),
-                    'updated_at': int(time.time()),
+                    'created_at': now,
+                    'updated_at': now,
                 }
             )
 
@@ -159,6 +161,28 @@ class FilesTable:
                 log.exception(f'Error inserting a new file: {e}')
                 return None
 
+    async def insert_new_files(
+        self, user_id: str, form_data_list: list[FileForm], db: Optional[AsyncSession] = None
+    ) -> int:
+        """Insert several files in a single commit. Returns the number inserted (0 on failure)."""
+        if not form_data_list:
+            return 0
+        async with get_async_db_context(db) as db:
+            now = int(time.time())
+            try:
+                for form_data in form_data_list:
+                    file_data = form_data.model_dump()
+                    if file_data.get('meta'):
+                        file_data['meta'] = sanitize_metadata(file_data['meta'])
+                    file = FileModel(**{**file_data, 'user_id': user_id, 'created_at': now, 'updated_at': now})
+                    db.add(File(**file.model_dump()))
+                await db.commit()
+                return len(form_data_list)
+            except Exception as e:
+                log.exception(f'Error inserting new files: {e}')
+                await db.rollback()
+                return 0
+
     async def get_file_by_id(self, id: str, db: Optional[AsyncSession] = None) -> Optional[FileModel]:
         try:
             async with get_async_db_context(db) as db:
@@ -340,6 +364,9 @@ class FilesTable:
                 if form_data.meta is not None:
                     file.meta = {**(file.meta if file.meta else {}), **form_data.meta}
 
+                if form_data.path is not None:
+                    file.path = form_data.path
+
                 file.updated_at = int(time.time())
                 await db.commit()
                 return FileModel.model_validate(file)
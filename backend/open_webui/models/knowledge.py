@@ -693,6 +693,54 @@ class KnowledgeTable:
                 else:
                     return None
             except Exception:
+                # Leave a shared session usable for the caller's next attach.
+                await db.rollback()
+                return None
+
+    async def add_files_to_knowledge_by_ids(
+        self,
+        knowledge_id: str,
+        file_ids: list[str],
+        user_id: str,
+        db: Optional[AsyncSession] = None,
+    ) -> Optional[int]:
+        """Attach several files to a knowledge base in one transaction.
+
+        Files already attached are skipped. Returns the number of rows added,
+        or None if the transaction failed and nothing was attached (e.g. a
+        concurrent attach hit the unique constraint), so callers can fall back
+        to ``add_file_to_knowledge_by_id`` per file.
+        """
+        if not file_ids:
+            return 0
+        async with get_async_db_context(db) as db:
+            try:
+                result = await db.execute(
+                    select(KnowledgeFile.file_id).filter(
+                        KnowledgeFile.knowledge_id == knowledge_id,
+                        KnowledgeFile.file_id.in_(file_ids),
+                    )
+                )
+                attached = set(result.scalars().all())
+                now = int(time.time())
+                rows = [
+                    KnowledgeFile(
+                        id=str(uuid.uuid4()),
+                        knowledge_id=knowledge_id,
+                        file_id=file_id,
+                        user_id=user_id,
+                        created_at=now,
+                        updated_at=now,
+                    )
+                    for file_id in dict.fromkeys(file_ids)
+                    if file_id not in attached
+                ]
+                db.add_all(rows)
+                await db.commit()
+                return len(rows)
+            except Exception as e:
+                log.exception(f'Error attaching files to knowledge {knowledge_id}: {e}')
+                await db.rollback()
                 return None
 
     async def has_file(self, knowledge_id: str, file_id: str, db: Optional[AsyncSession] = None) -> bool:
@@ -717,6 +765,25 @@ class KnowledgeTable:
         except Exception:
             return False
 
+    async def remove_files_from_knowledge_by_ids(
+        self, knowledge_id: str, file_ids: list[str], db: Optional[AsyncSession] = None
+    ) -> bool:
+        """Bulk variant of remove_file_from_knowledge_by_id (one DELETE ... IN)."""
+        if not file_ids:
+            return True
+        try:
+            async with get_async_db_context(db) as db:
+                await db.execute(
+                    delete(KnowledgeFile).filter(
+                        KnowledgeFile.knowledge_id == knowledge_id,
+                        KnowledgeFile.file_id.in_(file_ids),
+                    )
+                )
+                await db.commit()
+                return True
+        except Exception:
+            return False
+
     async def reset_knowledge_by_id(self, id: str, db: Optional[AsyncSession] = None) -> Optional[KnowledgeModel]:
         try:
             async with get_async_db_context(db) as db:
@@ -347,10 +347,12 @@ async def accept_invite(
 async def list_invites(user=Depends(get_admin_user)):
     invites = await Invites.get_pending_invites()
 
+    inviter_ids = list({invite.invited_by for invite in invites})
+    inviter_names = {u.id: u.name for u in await Users.get_users_by_user_ids(inviter_ids)} if inviter_ids else {}
+
     result = []
     for invite in invites:
-        invited_by_user = await Users.get_user_by_id(invite.invited_by)
-        invited_by_name = invited_by_user.name if invited_by_user else 'Unknown'
+        invited_by_name = inviter_names.get(invite.invited_by, 'Unknown')
 
         result.append(
             InviteListItem(
@@ -1235,12 +1235,23 @@ async def add_files_to_knowledge_batch(
 
     # Only add files that were successfully processed
     successful_file_ids = [r.file_id for r in result.results if r.status == 'completed']
-    for file_id in successful_file_ids:
-        await Knowledges.add_file_to_knowledge_by_id(knowledge_id=id, file_id=file_id, user_id=user.id, db=db)
+    error_details = [f'{err.file_id}: {err.error}' for err in result.errors]
+    added = await Knowledges.add_files_to_knowledge_by_ids(
+        knowledge_id=id, file_ids=successful_file_ids, user_id=user.id, db=db
+    )
+    if added is None:
+        # The batch attach rolled back as a whole; attach one by one so a
+        # single conflicting file doesn't drop the rest, and report failures.
+        for file_id in successful_file_ids:
+            attached = await Knowledges.add_file_to_knowledge_by_id(
+                knowledge_id=id, file_id=file_id, user_id=user.id, db=db
+            )
+            # A conflict here usually means a concurrent request attached it.
+            if not attached and not await Knowledges.has_file(id, file_id, db=db):
+                error_details.append(f'{file_id}: Failed to add file to knowledge base')
 
     # If there were any errors, include them in the response
-    if result.errors:
-        error_details = [f'{err.file_id}: {err.error}' for err in result.errors]
+    if error_details:
         return KnowledgeFilesResponse(
             **knowledge.model_dump(),
             files=await Knowledges.get_file_metadatas_by_id(knowledge.id, db=db),
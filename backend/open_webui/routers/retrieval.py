@@ -2768,10 +2768,13 @@ async def process_files_batch(
     # Prepare all documents first
     all_docs: List[Document] = []
 
+    # One IN query for the ownership checks below instead of a SELECT per file
+    db_files = {f.id: f for f in await Files.get_files_by_ids([file.id for file in form_data.files], db=db)}
+
     for file in form_data.files:
         try:
             # Ownership check: verify the requesting user owns the file or is an admin
-            db_file = await Files.get_file_by_id(file.id, db=db)
+            db_file = db_files.get(file.id)
             if not db_file:
                 file_errors.append(
                     BatchProcessFilesResult(
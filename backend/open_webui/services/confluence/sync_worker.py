@@ -25,7 +25,6 @@ from open_webui.config import (
     CONFLUENCE_MAX_PAGE_SIZE_MB,
 )
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
-from open_webui.services.deletion import DeletionService
 
 log = logging.getLogger(__name__)
 
@@ -461,22 +460,25 @@ class ConfluenceSyncWorker(BaseSyncWorker):
         client = self._client_for(cloud_id)
 
         # Skip if this page was already queued by a space / subtree source.
+        # Sources are collected concurrently, so claim the key before the
+        # fetch: an overlapping space listing must not queue it meanwhile.
         seen_key = (cloud_id, source['item_id'])
         if seen_key in self._seen_page_ids:
             return None
+        self._seen_page_ids.add(seen_key)
 
         try:
             page = await client.get_page(source['item_id'], include_body=False)
         except Exception as e:
             log.error('Failed to fetch Confluence page %s: %s', source.get('name'), e)
+            self._seen_page_ids.discard(seen_key)
             return None
 
         if not page:
             log.warning('Confluence page not found: %s', source.get('name'))
+            self._seen_page_ids.discard(seen_key)
             return None
 
-        self._seen_page_ids.add(seen_key)
-
         current_version = int((page.get('version') or {}).get('number') or 0)
         stored_version = int(source.get('last_synced_version') or 0)
 
@@ -871,12 +873,12 @@ class ConfluenceSyncWorker(BaseSyncWorker):
         """Remove all files associated with a revoked Confluence source."""
         source_name = source.get('name', 'unknown')
         source_item_id = source.get('item_id')
-        removed_count = 0
 
-        files = await Knowledges.get_files_by_id(self.knowledge_id)
+        files = await self._get_kb_files()
         if not files:
             return 0
 
+        matched_ids: List[str] = []
         for file in files:
             if not file.id.startswith(_FILE_ID_PREFIX):
                 continue
@@ -885,22 +887,9 @@ class ConfluenceSyncWorker(BaseSyncWorker):
             if file_meta.get('source_item_id') != source_item_id:
                 continue
 
-            await Knowledges.remove_file_from_knowledge_by_id(self.knowledge_id, file.id)
-            try:
-                from open_webui.retrieval.vector.async_client import ASYNC_VECTOR_DB_CLIENT
-
-                await ASYNC_VECTOR_DB_CLIENT.delete(
-                    collection_name=self.knowledge_id,
-                    filter={'file_id': file.id},
-                )
-            except Exception as e:
-                log.warning('Failed to remove vectors for %s: %s', file.id, e)
-
-            remaining = await Knowledges.get_knowledge_files_by_file_id(file.id)
-            if not remaining:
-                await DeletionService.delete_file(file.id)
+            matched_ids.append(file.id)
 
-            removed_count += 1
+        removed_count = await self._remove_files_from_kb(matched_ids)
 
         log.info(
             'Removed %d files from KB %s due to revoked access to Confluence source "%s"',
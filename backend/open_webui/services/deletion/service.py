@@ -71,19 +71,30 @@ class DeletionService:
             report.add_error(f'File {file_id} not found in database')
             return report
 
-        # 1. Find all knowledge bases containing this file and remove vectors
+        # 1. Find all knowledge bases containing this file and remove vectors.
+        #    Collections are independent, so clear them concurrently.
         knowledge_files = await Knowledges.get_knowledge_files_by_file_id(file_id)
-        for kf in knowledge_files:
+
+        async def _delete_kb_vectors(knowledge_id: str) -> tuple[bool, Optional[str]]:
+            deleted = False
             try:
                 # Delete vectors by file_id from the knowledge collection
-                await ASYNC_VECTOR_DB_CLIENT.delete(collection_name=kf.knowledge_id, filter={'file_id': file_id})
-                report.vector_documents += 1
+                await ASYNC_VECTOR_DB_CLIENT.delete(collection_name=knowledge_id, filter={'file_id': file_id})
+                deleted = True
 
                 # Delete by hash as well (duplicates may exist)
                 if file.hash:
-                    await ASYNC_VECTOR_DB_CLIENT.delete(collection_name=kf.knowledge_id, filter={'hash': file.hash})
+                    await ASYNC_VECTOR_DB_CLIENT.delete(collection_name=knowledge_id, filter={'hash': file.hash})
+                return deleted, None
             except Exception as e:
-                report.add_error(f'Failed to remove vectors from knowledge {kf.knowledge_id}: {e}')
+                return deleted, str(e)
+
+        results = await asyncio.gather(*(_delete_kb_vectors(kf.knowledge_id) for kf in knowledge_files))
+        for kf, (deleted, error) in zip(knowledge_files, results):
+            if deleted:
+                report.vector_documents += 1
+            if error:
+                report.add_error(f'Failed to remove vectors from knowledge {kf.knowledge_id}: {error}')
 
         # 2. Delete the file's own vector collection
         try:
@@ -4,7 +4,6 @@ import asyncio
 import logging
 import time
 from typing import Optional, Dict, Any, List
-from pathlib import Path
 
 from open_webui.services.google_drive.drive_client import (
     GoogleDriveClient,
@@ -17,16 +16,17 @@ from open_webui.config import (
     GOOGLE_DRIVE_MAX_FILE_SIZE_MB,
 )
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
-from open_webui.services.deletion import DeletionService
 from open_webui.services.sync.constants import (
     SyncErrorType,
     FailedFile,
-    SUPPORTED_EXTENSIONS,
+    content_type_for,
 )
 from open_webui.services.sync.base_worker import BaseSyncWorker
 
 log = logging.getLogger(__name__)
 
+MAX_FILE_SIZE_BYTES = GOOGLE_DRIVE_MAX_FILE_SIZE_MB * 1024 * 1024
+
 
 class GoogleDriveSyncWorker(BaseSyncWorker):
     """Worker to sync Google Drive folder contents to a Knowledge base."""
@@ -91,22 +91,19 @@ class GoogleDriveSyncWorker(BaseSyncWorker):
 
         # Other Google apps types we can't export
         if mime_type.startswith('application/vnd.google-apps.'):
-            log.debug(f'Skipping unsupported Google Apps type: {mime_type}')
+            log.debug('Skipping unsupported Google Apps type: %s', mime_type)
             return False
 
         name = item.get('name', '')
-        ext = Path(name).suffix.lower()
-
-        if ext not in SUPPORTED_EXTENSIONS:
-            log.debug(f'Skipping unsupported file type: {name}')
+        if content_type_for(name) is None:
+            log.debug('Skipping unsupported file type: %s', name)
             return False
 
         size = item.get('size', 0)
         if size:
             size = int(size)
-            max_size = GOOGLE_DRIVE_MAX_FILE_SIZE_MB * 1024 * 1024
-            if size > max_size:
-                log.warning(f'Skipping {name}: size {size} exceeds max {max_size}')
+            if size > MAX_FILE_SIZE_BYTES:
+                log.warning(f'Skipping {name}: size {size} exceeds max {MAX_FILE_SIZE_BYTES}')
                 return False
 
         return True
@@ -348,9 +345,9 @@ class GoogleDriveSyncWorker(BaseSyncWorker):
     async def _handle_revoked_source(self, source: Dict[str, Any]) -> int:
         """Remove all files associated with a revoked source from this KB."""
         source_name = source.get('name', 'unknown')
-        removed_count = 0
+        matched_ids: List[str] = []
 
-        files = await Knowledges.get_files_by_id(self.knowledge_id)
+        files = await self._get_kb_files()
         if not files:
             return 0
 
@@ -365,22 +362,9 @@ class GoogleDriveSyncWorker(BaseSyncWorker):
             if file_source_item_id and file_source_item_id != source_item_id:
                 continue
 
-            await Knowledges.remove_file_from_knowledge_by_id(self.knowledge_id, file.id)
-            try:
-                from open_webui.retrieval.vector.async_client import ASYNC_VECTOR_DB_CLIENT
-
-                await ASYNC_VECTOR_DB_CLIENT.delete(
-                    collection_name=self.knowledge_id,
-                    filter={'file_id': file.id},
-                )
-            except Exception as e:
-                log.warning(f'Failed to remove vectors for {file.id}: {e}')
-
-            remaining = await Knowledges.get_knowledge_files_by_file_id(file.id)
-            if not remaining:
-                await DeletionService.delete_file(file.id)
+            matched_ids.append(file.id)
 
-            removed_count += 1
+        removed_count = await self._remove_files_from_kb(matched_ids)
 
         log.info(
             f"Removed {removed_count} files from KB {self.knowledge_id} due to revoked access to source '{source_name}'"
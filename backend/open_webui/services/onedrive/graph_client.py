@@ -3,11 +3,54 @@
 import httpx
 import asyncio
 import logging
-from typing import Optional, Callable, Awaitable, Dict, Any, List, Tuple
+import datetime as dt
+import random
+from email.utils import parsedate_to_datetime
+from typing import Optional, Callable, Awaitable, AsyncIterator, Dict, Any, List, Mapping, Tuple
 
 log = logging.getLogger(__name__)
 
 GRAPH_BASE_URL = 'https://graph.microsoft.com/v1.0'
+# Graph JSON batching accepts at most 20 sub-requests per $batch call.
+GRAPH_BATCH_MAX_REQUESTS = 20
+# Chunk size for streamed downloads: large enough that hashing and spool
+# writes run once per MiB rather than once per network read.
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Upper bound on the total time one call spends sleeping between retries, so
+# a run of long Retry-After values fails the call instead of stalling the sync.
+RETRY_DEADLINE_SECONDS = 300
+
+
+def _should_retry(status: int) -> bool:
+    """Throttling and server errors are transient; any other status is final."""
+    return status == 429 or status >= 500
+
+
+def _retry_after_seconds(headers: Optional[Mapping[str, str]], default: float) -> float:
+    """Parse ``Retry-After`` as delta-seconds or an HTTP-date.
+
+    ``headers`` may be an ``httpx.Headers`` or the plain dict of a ``$batch``
+    sub-response, so the name is matched case-insensitively. Falls back to
+    ``default`` when the header is missing or malformed.
+    """
+    value = next((v for k, v in (headers or {}).items() if k.lower() == 'retry-after'), None)
+    if value is None:
+        return default
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=dt.timezone.utc)
+    return max(0.0, (retry_at - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+
+def _with_jitter(seconds: float) -> float:
+    """Spread retries by up to 20% so throttled callers don't resume in lockstep."""
+    return seconds + random.uniform(0, seconds * 0.2)
 
 
 class GraphClient:
@@ -24,7 +67,9 @@ class GraphClient:
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=30.0)
+            # HTTP/2 lets concurrent Graph calls and file downloads share one
+            # TLS connection per host instead of opening one each.
+            self._client = httpx.AsyncClient(timeout=30.0, http2=True)
         return self._client
 
     async def close(self):
@@ -39,18 +84,24 @@ class GraphClient:
         params: Optional[Dict[str, Any]] = None,
         max_retries: int = 3,
         follow_redirects: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+        json: Optional[Any] = None,
     ) -> httpx.Response:
         """Make authenticated request with retry logic.
 
         Handles:
         - 401: Token refresh via token_provider callback (once)
         - 410: Delta token expired (returned to caller for handling)
-        - 429: Respects Retry-After header
+        - 429: Respects Retry-After header (seconds or HTTP-date), with jitter
         - 5xx: Exponential backoff
+
+        A throttled or failing response is returned as-is once the retries
+        would sleep past ``RETRY_DEADLINE_SECONDS`` in total.
         """
         client = await self._get_client()
         last_exception = None
         token_refreshed = False
+        waited = 0.0
 
         for attempt in range(max_retries):
             try:
@@ -58,7 +109,8 @@ class GraphClient:
                     method,
                     url,
                     params=params,
-                    headers={'Authorization': f'Bearer {self._access_token}'},
+                    json=json,
+                    headers={**(headers or {}), 'Authorization': f'Bearer {self._access_token}'},
                     follow_redirects=follow_redirects,
                 )
 
@@ -80,19 +132,21 @@ class GraphClient:
                     log.info('Received 410 Gone — delta token expired')
                     return response  # Let caller handle by clearing delta_link
 
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', '60'))
-                    log.warning('Rate limited, waiting %d seconds', retry_after)
-                    await asyncio.sleep(retry_after)
-                    continue
-
-                if response.status_code >= 500:
-                    wait_time = 2**attempt
-                    log.warning(
-                        'Server error %d, retrying in %d seconds',
-                        response.status_code,
-                        wait_time,
-                    )
+                if _should_retry(response.status_code):
+                    if response.status_code == 429:
+                        wait_time = _with_jitter(_retry_after_seconds(response.headers, 60))
+                        log.warning('Rate limited, waiting %.1f seconds', wait_time)
+                    else:
+                        wait_time = 2**attempt
+                        log.warning(
+                            'Server error %d, retrying in %d seconds',
+                            response.status_code,
+                            wait_time,
+                        )
+                    if waited + wait_time > RETRY_DEADLINE_SECONDS:
+                        log.warning('Retry deadline of %ds exceeded, giving up', RETRY_DEADLINE_SECONDS)
+                        return response
+                    waited += wait_time
                     await asyncio.sleep(wait_time)
                     continue
 
@@ -215,6 +269,44 @@ class GraphClient:
         response.raise_for_status()
         return response.content
 
+    async def stream_file(self, drive_id: str, item_id: str) -> AsyncIterator[bytes]:
+        """Stream file content in chunks instead of buffering the whole body.
+
+        Graph answers ``/content`` with a 302 to a pre-authenticated download
+        URL; that URL is streamed without the bearer token. A direct 200 is
+        yielded as a single chunk.
+
+        Removed in cleanup commit after USE_SHARED_LOADER rollout completes,
+        together with ``download_file``.
+        """
+        url = f'{GRAPH_BASE_URL}/drives/{drive_id}/items/{item_id}/content'
+        response = await self._request_with_retry('GET', url)
+        location = response.headers.get('Location')
+        if not response.is_redirect or not location:
+            response.raise_for_status()
+            yield response.content
+            return
+
+        # The download host throttles like Graph itself: retry 429 / 5xx
+        # (before any bytes are yielded) with the same backoff as
+        # ``_request_with_retry``.
+        client = await self._get_client()
+        max_retries = 3
+        for attempt in range(max_retries):
+            async with client.stream('GET', location, follow_redirects=True) as stream:
+                status_code = stream.status_code
+                if _should_retry(status_code) and attempt < max_retries - 1:
+                    wait_time = _retry_after_seconds(stream.headers, 2**attempt)
+                    if status_code == 429:
+                        wait_time = _with_jitter(wait_time)
+                else:
+                    stream.raise_for_status()
+                    async for chunk in stream.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        yield chunk
+                    return
+            log.warning('Download stream returned %d, retrying in %d seconds', status_code, wait_time)
+            await asyncio.sleep(wait_time)
+
     async def get_item_metadata(self, drive_id: str, item_id: str) -> Dict[str, Any]:
         """Get metadata for a specific item."""
         url = f'{GRAPH_BASE_URL}/drives/{drive_id}/items/{item_id}'
@@ -229,6 +321,65 @@ class GraphClient:
         response.raise_for_status()
         return response.json()
 
+    async def get_item_if_modified(
+        self, drive_id: str, item_id: str, etag: str
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Conditional ``get_item`` keyed on a previously seen eTag.
+
+        Returns ``(False, None)`` when Graph answers 304 Not Modified,
+        otherwise ``(True, item)`` with ``item`` None if not found.
+        """
+        url = f'{GRAPH_BASE_URL}/drives/{drive_id}/items/{item_id}'
+        response = await self._request_with_retry('GET', url, headers={'If-None-Match': etag})
+        if response.status_code == 304:
+            return False, None
+        if response.status_code == 404:
+            return True, None
+        response.raise_for_status()
+        return True, response.json()
+
+    async def batch_get(self, paths: List[str], max_retries: int = 3) -> List[Tuple[int, Any]]:
+        """GET several Graph resources through JSON batching (``/$batch``).
+
+        ``paths`` are relative to the API version, e.g.
+        ``/drives/{drive_id}/items/{item_id}``. Returns ``(status, body)`` per
+        path, in order. Sub-requests answered with 429 / 5xx are resubmitted on
+        their own after the longest sub-response Retry-After; whatever still
+        fails after ``max_retries`` is returned as-is for the caller to interpret.
+        """
+        results: List[Tuple[int, Any]] = [(0, None)] * len(paths)
+        for start in range(0, len(paths), GRAPH_BATCH_MAX_REQUESTS):
+            pending = list(range(start, min(start + GRAPH_BATCH_MAX_REQUESTS, len(paths))))
+            waited = 0.0
+            for attempt in range(max_retries):
+                payload = {'requests': [{'id': str(i), 'method': 'GET', 'url': paths[i]} for i in pending]}
+                response = await self._request_with_retry('POST', f'{GRAPH_BASE_URL}/$batch', json=payload)
+                response.raise_for_status()
+                # Graph may answer sub-requests in any order; match them by id.
+                by_id = {r.get('id'): r for r in response.json().get('responses', [])}
+                retry: List[int] = []
+                wait_time = 0.0
+                for i in pending:
+                    sub = by_id.get(str(i), {})
+                    status = sub.get('status', 0)
+                    results[i] = (status, sub.get('body'))
+                    if _should_retry(status):
+                        retry.append(i)
+                        wait_time = max(wait_time, _retry_after_seconds(sub.get('headers'), 2**attempt))
+                wait_time = _with_jitter(wait_time)
+                if not retry or attempt == max_retries - 1 or waited + wait_time > RETRY_DEADLINE_SECONDS:
+                    break
+                log.warning(
+                    '%d of %d batch sub-requests throttled or failed, retrying in %.1f seconds',
+                    len(retry),
+                    len(pending),
+                    wait_time,
+                )
+                waited += wait_time
+                await asyncio.sleep(wait_time)
+                pending = retry
+        return results
+
     async def get_folder_permissions(
         self,
         drive_id: str,
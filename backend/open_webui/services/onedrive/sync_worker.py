@@ -4,8 +4,7 @@ import asyncio
 import httpx
 import logging
 import time
-from typing import Optional, Dict, Any, List
-from pathlib import Path
+from typing import Optional, AsyncIterator, Dict, Any, List
 
 from open_webui.services.onedrive.graph_client import GraphClient
 from open_webui.services.sync.base_worker import BaseSyncWorker
@@ -16,11 +15,10 @@ from open_webui.config import (
     ONEDRIVE_MAX_FILE_SIZE_MB,
 )
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
-from open_webui.services.deletion import DeletionService
 from open_webui.services.sync.constants import (
     SyncErrorType,
     FailedFile,
-    SUPPORTED_EXTENSIONS,
+    content_type_for,
 )
 
 log = logging.getLogger(__name__)
@@ -29,6 +27,19 @@ log = logging.getLogger(__name__)
 # re-enumeration of all folder sources on next sync (clears delta_link).
 FOLDER_MAP_VERSION = 1
 
+MAX_FILE_SIZE_BYTES = ONEDRIVE_MAX_FILE_SIZE_MB * 1024 * 1024
+
+
+def _content_fingerprint(item: Dict[str, Any]) -> Optional[str]:
+    """Server-side change marker for a driveItem's content.
+
+    OneDrive for Business provides sha256Hash, Personal provides quickXorHash.
+    Items Graph returns without hashes (e.g. some SharePoint library files)
+    fall back to ``cTag``, which changes only when the content changes.
+    """
+    hashes = item.get('file', {}).get('hashes', {})
+    return hashes.get('sha256Hash') or hashes.get('quickXorHash') or item.get('cTag')
+
 
 class OneDriveSyncWorker(BaseSyncWorker):
     """Worker to sync OneDrive folder contents to a Knowledge base."""
@@ -85,17 +96,13 @@ class OneDriveSyncWorker(BaseSyncWorker):
             return False
 
         name = item.get('name', '')
-        ext = Path(name).suffix.lower()
-
-        if ext not in SUPPORTED_EXTENSIONS:
-            log.debug(f'Skipping unsupported file type: {name}')
+        if content_type_for(name) is None:
+            log.debug('Skipping unsupported file type: %s', name)
             return False
 
         size = item.get('size', 0)
-        max_size = ONEDRIVE_MAX_FILE_SIZE_MB * 1024 * 1024
-
-        if size > max_size:
-            log.warning(f'Skipping {name}: size {size} exceeds max {max_size}')
+        if size > MAX_FILE_SIZE_BYTES:
+            log.warning(f'Skipping {name}: size {size} exceeds max {MAX_FILE_SIZE_BYTES}')
             return False
 
         return True
@@ -144,8 +151,17 @@ class OneDriveSyncWorker(BaseSyncWorker):
         # First pass: update folder_map with any folder items from delta.
         # Delta items may arrive in any order, so we loop until no new folders
         # can be resolved (handles nested folders whose parent appears later).
+        # Folders are split into live / removed in one scan of the delta page.
+        folder_items = []
+        removed_folder_ids = []
+        for item in items:
+            if 'folder' in item:
+                if '@removed' in item:
+                    removed_folder_ids.append(item.get('id', ''))
+                else:
+                    folder_items.append(item)
+
         changed = True
-        folder_items = [item for item in items if 'folder' in item and '@removed' not in item]
         while changed:
             changed = False
             for item in folder_items:
@@ -158,10 +174,10 @@ class OneDriveSyncWorker(BaseSyncWorker):
                     folder_map[item['id']] = new_path
                     changed = True
 
-        # Handle deleted folders
-        for item in items:
-            if 'folder' in item and '@removed' in item:
-                folder_map.pop(item.get('id', ''), None)
+        # Handle deleted folders (after resolution, so their children still
+        # resolved against the old path above)
+        for folder_id in removed_folder_ids:
+            folder_map.pop(folder_id, None)
 
         # Persist updated folder_map and version back to source
         source['folder_map'] = folder_map
@@ -194,40 +210,65 @@ class OneDriveSyncWorker(BaseSyncWorker):
 
         return files_to_process, deleted_count
 
+    async def _resync_reason(self, item_id: str) -> Optional[str]:
+        """Why the local record for ``item_id`` needs re-syncing, or None if it's completed.
+
+        An unchanged upstream file still has to be re-synced when its record
+        was deleted (orphan cleanup) or its processing failed.
+        """
+        existing = await Files.get_file_by_id(f'{self.file_id_prefix}{item_id}')
+        if not existing:
+            return 'missing'
+        if (existing.data or {}).get('status') != 'completed':
+            return 'not processed'
+        return None
+
+    async def _fetch_single_file_item(self, source: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get the item for a single-file source, or None if it needs no sync.
+
+        When the source carries the eTag from its last sync, the metadata fetch
+        is conditional: a 304 with a completed local record means nothing to
+        do. Folder sources don't need this — their ``delta_link`` already plays
+        that role. Returns None with a warning when the item no longer exists.
+        """
+        etag = source.get('etag')
+        if etag and source.get('content_hash'):
+            modified, item = await self._client.get_item_if_modified(source['drive_id'], source['item_id'], etag)
+            if modified:
+                return item
+            if await self._resync_reason(source['item_id']) is None:
+                log.debug(f'File unchanged (eTag match): {source["name"]}')
+                return None
+            # Unchanged upstream but not ingested locally — do a full fetch so
+            # the item can be re-synced.
+        item = await self._client.get_item(source['drive_id'], source['item_id'])
+        if not item:
+            log.warning(f'File not found: {source["name"]}')
+        return item
+
     async def _collect_single_file(self, source: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Check if a single file needs syncing based on content hash."""
+        """Check if a single file needs syncing based on eTag and content hash."""
         try:
-            # Get current file metadata from Graph API
-            item = await self._client.get_item(source['drive_id'], source['item_id'])
-
+            item = await self._fetch_single_file_item(source)
             if not item:
-                log.warning(f'File not found: {source["name"]}')
                 return None
 
             if not self._is_supported_file(item):
                 log.info(f'Skipping unsupported single-file source {source.get("name", item.get("name", "?"))}')
                 return None
 
-            # Check content hash for changes
-            # OneDrive returns different hash types depending on the drive:
-            # - sha256Hash: OneDrive for Business
-            # - quickXorHash: OneDrive Personal
-            hashes = item.get('file', {}).get('hashes', {})
-            current_hash = hashes.get('sha256Hash') or hashes.get('quickXorHash')
+            # Check content hash (or cTag) for changes
+            current_hash = _content_fingerprint(item)
             stored_hash = source.get('content_hash')
 
             if current_hash and current_hash == stored_hash:
                 # Hash matches on OneDrive side, but verify the file was
-                # actually processed successfully. If the file record was
-                # deleted (orphan cleanup) or processing failed, re-sync it.
-                file_id = f'onedrive-{source["item_id"]}'
-                existing = await Files.get_file_by_id(file_id)
-                if existing and (existing.data or {}).get('status') == 'completed':
+                # actually processed successfully.
+                reason = await self._resync_reason(source['item_id'])
+                if reason is None:
                     log.info(f'File unchanged (hash match): {source["name"]}')
                     return None
-                else:
-                    reason = 'missing' if not existing else 'not processed'
-                    log.info(f'File {source["name"]} hash matches but record {reason}, re-syncing')
+                log.info(f'File {source["name"]} hash matches but record {reason}, re-syncing')
 
             if not current_hash:
                 log.warning(f'No hash available from OneDrive for: {source["name"]}')
@@ -236,8 +277,9 @@ class OneDriveSyncWorker(BaseSyncWorker):
             elif current_hash != stored_hash:
                 log.info(f'File changed (hash mismatch): {source["name"]}')
 
-            # Store new hash for later save
+            # Store new hash (and eTag for the next conditional fetch) for later save
             source['content_hash'] = current_hash
+            source['etag'] = item.get('eTag')
 
             return {
                 'item': item,
@@ -252,13 +294,8 @@ class OneDriveSyncWorker(BaseSyncWorker):
             return None
 
     def _get_cloud_hash(self, file_info: Dict[str, Any]) -> Optional[str]:
-        """Extract OneDrive hash from item metadata.
-
-        OneDrive for Business provides sha256Hash, Personal provides quickXorHash.
-        """
-        item = file_info['item']
-        hashes = item.get('file', {}).get('hashes', {})
-        return hashes.get('sha256Hash') or hashes.get('quickXorHash')
+        """Extract OneDrive content hash (or cTag) from item metadata."""
+        return _content_fingerprint(file_info['item'])
 
     async def _download_file_content(self, file_info: Dict[str, Any]) -> bytes:
         """Download file content from OneDrive.
@@ -270,6 +307,11 @@ class OneDriveSyncWorker(BaseSyncWorker):
         item_id = file_info['item']['id']
         return await self._client.download_file(drive_id, item_id)
 
+    async def _iter_file_content(self, file_info: Dict[str, Any]) -> AsyncIterator[bytes]:
+        """Stream file content from OneDrive (legacy fallback only)."""
+        async for chunk in self._client.stream_file(file_info['drive_id'], file_info['item']['id']):
+            yield chunk
+
     def _item_from_file_info(self, file_info: Dict[str, Any], access_token: str) -> Dict[str, Any]:
         item = super()._item_from_file_info(file_info, access_token)
         item['source_descriptor'] = {
@@ -396,13 +438,44 @@ class OneDriveSyncWorker(BaseSyncWorker):
             log.warning(f'Error verifying access to {source_type} {drive_id}/{item_id}: {e}')
             return True
 
+    async def _verify_sources_access(self, sources: List[Dict[str, Any]]) -> List[bool]:
+        """Check every source with Graph JSON batching (20 items per round-trip).
+
+        Same rules as ``_verify_source_access``: only 403/404 count as lost
+        access. Falls back to per-source checks if the batch call fails.
+        """
+        if len(sources) < 2:
+            return await super()._verify_sources_access(sources)
+
+        try:
+            responses = await self._client.batch_get(
+                [f'/drives/{source.get("drive_id")}/items/{source.get("item_id")}' for source in sources]
+            )
+        except Exception as e:
+            log.warning(f'Batched access check failed, verifying sources individually: {e}')
+            return await super()._verify_sources_access(sources)
+
+        access = []
+        for source, (status, _) in zip(sources, responses):
+            source_ref = f'{source.get("type", "folder")} {source.get("drive_id")}/{source.get("item_id")}'
+            if status in (403, 404):
+                log.warning(f'User {self.user_id} lost access to {source_ref}: {status}')
+                access.append(False)
+                continue
+            if not 200 <= status < 300:
+                # 5xx / throttled sub-requests: assume access is still valid
+                # to avoid accidentally removing files
+                log.warning(f'Error verifying access to {source_ref}: {status}')
+            access.append(True)
+        return access
+
     async def _handle_revoked_source(self, source: Dict[str, Any]) -> int:
         """Remove all files associated with a revoked source from this KB."""
         source_name = source.get('name', 'unknown')
         source_drive_id = source.get('drive_id')
-        removed_count = 0
+        matched_ids: List[str] = []
 
-        files = await Knowledges.get_files_by_id(self.knowledge_id)
+        files = await self._get_kb_files()
         if not files:
             return 0
 
@@ -424,25 +497,11 @@ class OneDriveSyncWorker(BaseSyncWorker):
                 if not (file_drive_id and source_drive_id and file_drive_id == source_drive_id):
                     continue
 
-            # Matched - proceed with removal
-            await Knowledges.remove_file_from_knowledge_by_id(self.knowledge_id, file.id)
-            # Remove vectors from KB collection
-            try:
-                from open_webui.retrieval.vector.async_client import ASYNC_VECTOR_DB_CLIENT
-
-                await ASYNC_VECTOR_DB_CLIENT.delete(
-                    collection_name=self.knowledge_id,
-                    filter={'file_id': file.id},
-                )
-            except Exception as e:
-                log.warning(f'Failed to remove vectors for {file.id}: {e}')
-
-            # Check for orphans - use DeletionService for full cleanup (vectors + storage + DB)
-            remaining = await Knowledges.get_knowledge_files_by_file_id(file.id)
-            if not remaining:
-                await DeletionService.delete_file(file.id)
+            matched_ids.append(file.id)
 
-            removed_count += 1
+        # Remove all matched files in one batch (association rows, KB vectors,
+        # orphan cleanup) instead of 3-4 round-trips per file.
+        removed_count = await self._remove_files_from_kb(matched_ids)
 
         log.info(
             f"Removed {removed_count} files from KB {self.knowledge_id} due to revoked access to source '{source_name}'"
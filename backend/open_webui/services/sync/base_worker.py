@@ -1,29 +1,30 @@
 """Base sync worker - shared logic for cloud storage sync workers."""
 
 import asyncio
-import io
+import contextlib
+import functools
 import logging
 import os
 import time
 import hashlib
+import json
+import tempfile
 import uuid
 
 import httpx
 from abc import ABC, abstractmethod
-from dataclasses import asdict, dataclass
-from typing import Optional, Callable, Awaitable, Dict, Any, List, Union
-from pathlib import Path
+from dataclasses import asdict, dataclass, field
+from typing import Optional, Callable, Awaitable, AsyncIterator, Dict, Any, List, Sequence, Tuple, Union
 
-from open_webui.internal.db import get_async_db
 from open_webui.models.knowledge import Knowledges
-from open_webui.models.files import Files, FileForm, FileUpdateForm
+from open_webui.models.files import Files, FileForm, FileModel, FileUpdateForm
 from open_webui.models.users import Users
 from open_webui.storage.provider import Storage
 from open_webui.config import FILE_PROCESSING_MAX_CONCURRENT, KNOWLEDGE_MAX_FILE_COUNT
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
 from open_webui.retrieval.vector.async_client import ASYNC_VECTOR_DB_CLIENT
 from open_webui.services.deletion import DeletionService
-from open_webui.services.sync.constants import SyncErrorType, FailedFile, CONTENT_TYPES
+from open_webui.services.sync.constants import SyncErrorType, FailedFile, content_type_for
 from open_webui.services.sync.events import (
     emit_sync_progress,
     emit_file_processing,
@@ -75,6 +76,17 @@ _NON_RETRYABLE_LOADER_ERROR_CODES: frozenset[str] = frozenset(
 )
 
 
+def _short_err(e: BaseException, n: int = 100) -> str:
+    """Bounded, user-facing message for ``e``.
+
+    Uses only the first exception arg instead of ``str(e)``, so a long or
+    chained message isn't fully materialised just to be cut down. Falls back
+    to the exception class name for arg-less exceptions.
+    """
+    args = getattr(e, 'args', None)
+    return (str(args[0]) if args else type(e).__name__)[:n]
+
+
 class ConfigurationError(RuntimeError):
     """Raised when a sync prerequisite (env var, etc.) is missing or invalid.
 
@@ -110,6 +122,56 @@ def _validate_callback_base_url(url: str) -> None:
 # tenants with very large initial syncs.
 MAX_JOB_WALL_CLOCK_SECONDS = int(os.environ.get('SYNC_MAX_JOB_WALL_CLOCK_SECONDS', '1800'))
 
+# Max ids per ``IN (...)`` when bulk-loading File rows before classification.
+# Keeps each statement well under SQLite's bound-parameter limit.
+PREFETCH_CHUNK_SIZE = 500
+
+# Per-file pipeline steps log at DEBUG; the legacy pipeline emits one INFO
+# progress line every this many files instead.
+PROGRESS_LOG_INTERVAL = 100
+
+# Per-file 'syncing' progress is written to knowledge meta roughly this many
+# times per run (every ~5%); the Socket.IO progress event still fires per file.
+STATUS_PERSIST_STEPS = 20
+
+# Debounce window for the legacy pipeline's progress publisher: per-file
+# completions within this window collapse into one status update.
+PROGRESS_PUBLISH_INTERVAL = 0.1
+
+# Max sources handled concurrently in the per-source phases of a sync
+# (access verification, file collection); keeps a KB with many sources well
+# inside Graph / Drive throttling.
+SOURCE_FANOUT_CONCURRENCY = 8
+
+# Legacy-path downloads stay in memory up to this size, then spill to a temp
+# file, so N concurrent downloads of large files don't each hold the payload.
+DOWNLOAD_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+# Per-file timeout in the legacy pipeline: extraction (120s) + chunking
+# (120s) + embedding (300s) + overhead.
+FILE_PIPELINE_TIMEOUT = 600  # 10 minutes
+
+# Min seconds between knowledge-meta reads in ``_check_cancelled``. Cancels
+# issued in this process arrive instantly via ``request_cancel``; the poll
+# only covers cancels written by another worker process.
+CANCEL_POLL_INTERVAL = 2.0
+
+# Cancel events of the syncs running in this process, keyed by knowledge_id.
+_RUNNING_SYNCS: Dict[str, asyncio.Event] = {}
+
+
+def request_cancel(knowledge_id: str) -> bool:
+    """Signal a sync of ``knowledge_id`` running in this process to stop.
+
+    Callers still persist ``status='cancelled'`` to knowledge meta, which
+    stays authoritative across processes. Returns True if a sync was running here.
+    """
+    event = _RUNNING_SYNCS.get(knowledge_id)
+    if event is None:
+        return False
+    event.set()
+    return True
+
 
 @dataclass
 class PreparedFile:
@@ -120,6 +182,43 @@ class PreparedFile:
     name: str
     content_hash: str
     is_new: bool  # True if newly downloaded, False if hash-matched
+    # Row already loaded during Phase 1 (hash-matched files only); reused for
+    # the file-added event so Phase 2 doesn't re-read it.
+    file_record: Optional[FileModel] = None
+
+
+@dataclass
+class _LegacyRun:
+    """Counters and flags shared by the file tasks of one legacy-pipeline run.
+
+    Per-file completions only bump counters and set ``progress_dirty``; the
+    publisher coalesces them into status updates. Plain fields — no lock
+    needed on the event loop.
+    """
+
+    total_files: int
+    processed: int = 0
+    failed: int = 0
+    last_filename: str = ''
+    cancelled: bool = False
+    # Set once every file task is done, so the publisher flushes and exits.
+    finished: bool = False
+    progress_dirty: asyncio.Event = field(default_factory=asyncio.Event)
+    # Keyed by input index: tasks finish out of order.
+    failures: Dict[int, FailedFile] = field(default_factory=dict)
+
+    def failed_files(self) -> List[FailedFile]:
+        """Failures in the order the files were submitted."""
+        return [self.failures[i] for i in sorted(self.failures)]
+
+
+def _cancelled_failure(filename: str) -> FailedFile:
+    """FailedFile for a file skipped because the sync was cancelled."""
+    return FailedFile(
+        filename=filename,
+        error_type=SyncErrorType.PROCESSING_ERROR.value,
+        error_message='Sync cancelled by user',
+    )
 
 
 class BaseSyncWorker(ABC):
@@ -226,6 +325,33 @@ class BaseSyncWorker(ABC):
         """
         ...
 
+    async def _iter_file_content(self, file_info: Dict[str, Any]) -> AsyncIterator[bytes]:
+        """Yield file content in chunks. Default: one chunk from ``_download_file_content``.
+
+        Providers whose client can stream the body override this so the legacy
+        download path never holds a whole file in memory.
+        """
+        yield await self._download_file_content(file_info)
+
+    async def _download_to_spool(self, file_info: Dict[str, Any]) -> Tuple[tempfile.SpooledTemporaryFile, str, int]:
+        """Download into a spooled temp file, hashing as chunks arrive.
+
+        Returns ``(spool, sha256, size)`` with the spool rewound; the caller
+        closes it. Files above ``DOWNLOAD_SPOOL_MAX_BYTES`` roll over to disk.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_MAX_BYTES)
+        hasher = hashlib.sha256()
+        try:
+            async for chunk in self._iter_file_content(file_info):
+                hasher.update(chunk)
+                spool.write(chunk)
+            size = spool.tell()
+            spool.seek(0)
+        except BaseException:
+            spool.close()
+            raise
+        return spool, hasher.hexdigest(), size
+
     def _item_from_file_info(self, file_info: Dict[str, Any], access_token: str) -> Dict[str, Any]:
         """Build a loader-worker job item dict from a discovered file_info.
 
@@ -312,6 +438,20 @@ class BaseSyncWorker(ABC):
         """Verify the user can still access a source."""
         ...
 
+    async def _verify_sources_access(self, sources: List[Dict[str, Any]]) -> List[bool]:
+        """Access check for each source, in order.
+
+        Default fans ``_verify_source_access`` out with bounded concurrency;
+        providers with a batch API may override.
+        """
+        semaphore = asyncio.Semaphore(SOURCE_FANOUT_CONCURRENCY)
+
+        async def _verify(source: Dict[str, Any]) -> bool:
+            async with semaphore:
+                return await self._verify_source_access(source)
+
+        return list(await asyncio.gather(*(_verify(source) for source in sources)))
+
     @abstractmethod
     async def _handle_revoked_source(self, source: Dict[str, Any]) -> int:
         """Remove all files associated with a revoked source.
@@ -338,6 +478,9 @@ class BaseSyncWorker(ABC):
     ):
         self.knowledge_id = knowledge_id
         self.sources = sources
+        # Serialized sources as last persisted. Callers pass the list they just
+        # read from (or wrote to) knowledge meta, so it starts as the baseline.
+        self._saved_sources_json: Optional[str] = self._sources_json()
         self.access_token = access_token
         self.user_id = user_id
         self.app = app
@@ -350,6 +493,43 @@ class BaseSyncWorker(ABC):
         # flag for instant rollback until the cleanup commit removes it.
         self._use_shared_loader = use_shared_loader
         self._pipeline_client: Optional[PipelineClient] = PipelineClient() if use_shared_loader else None
+        self._reset_run_state()
+
+    def _reset_run_state(self) -> None:
+        """Initialise the state that lives for a single ``sync()`` run.
+
+        Called from ``__init__`` and again at the start of every ``sync()``,
+        so a reused worker doesn't carry a previous run's state over.
+        """
+        # Per-stage gates for the legacy pipeline, sized in ``sync()``. Each
+        # covers only its own stage (provider fetch, extraction / vector
+        # check, embed + insert) so one file's embedding overlaps with the
+        # next file's extraction and download.
+        self._download_sem: Optional[asyncio.Semaphore] = None
+        self._process_sem: Optional[asyncio.Semaphore] = None
+        self._embed_sem: Optional[asyncio.Semaphore] = None
+        # Per-file Socket.IO events for the legacy pipeline, drained in order
+        # by a background task in ``sync()`` so file tasks never wait on a
+        # send. None outside ``sync()``: events are emitted inline.
+        self._event_queue: Optional[asyncio.Queue] = None
+        # Set once a 'cancelled' status has been read back from knowledge
+        # meta, so throttled progress updates can skip without a DB read.
+        self._cancel_observed = False
+        # Set by ``request_cancel`` while ``sync()`` is running.
+        self._cancel_event: Optional[asyncio.Event] = None
+        self._cancel_polled_at: Optional[float] = None
+        # progress_current of the last 'syncing' tick written to meta.
+        self._persisted_progress: Optional[int] = None
+        # File rows bulk-loaded before classification, keyed by file_id. None
+        # until ``sync()`` fills it; the legacy download stage reads from it
+        # instead of issuing one SELECT per file.
+        self._prefetched_files: Optional[Dict[str, FileModel]] = None
+        # The KB's file list, loaded once per sync by ``_get_kb_files`` and
+        # kept current as revoked sources remove files.
+        self._kb_files: Optional[List[FileModel]] = None
+        # Stub File rows created for the current loader-worker job; failure
+        # paths fail-mark the ones still pending.
+        self._current_job_stub_file_ids: List[str] = []
 
     def _make_request(self):
         """Construct a minimal Request for calling retrieval functions directly."""
@@ -367,6 +547,48 @@ class BaseSyncWorker(ABC):
             }
         )
 
+    async def _emit(self, emit_fn, **kwargs) -> None:
+        """Queue a per-file event for the drain task, or emit it inline when none is running."""
+        if self._event_queue is not None:
+            self._event_queue.put_nowait((emit_fn, kwargs))
+        else:
+            await emit_fn(self.event_prefix, **kwargs)
+
+    async def _drain_events(self, queue: asyncio.Queue) -> None:
+        """Send queued events in order until the ``None`` sentinel."""
+        while (entry := await queue.get()) is not None:
+            emit_fn, kwargs = entry
+            await emit_fn(self.event_prefix, **kwargs)
+
+    @staticmethod
+    def _stage_gate(semaphore: Optional[asyncio.Semaphore]):
+        """Semaphore guarding a legacy pipeline stage, or a no-op outside ``sync()``."""
+        return semaphore or contextlib.nullcontext()
+
+    async def _emit_file_added(
+        self,
+        file_record: FileModel,
+        meta: Optional[Dict[str, Any]] = None,
+        updated_at: Optional[int] = None,
+    ) -> None:
+        """Emit the file-added event from an already-loaded File record.
+
+        ``meta`` / ``updated_at`` override the record's values when the caller
+        has written newer ones without re-reading the row.
+        """
+        await self._emit(
+            emit_file_added,
+            user_id=self.user_id,
+            knowledge_id=self.knowledge_id,
+            file_data={
+                'id': file_record.id,
+                'filename': file_record.filename,
+                'meta': meta if meta is not None else file_record.meta,
+                'created_at': file_record.created_at,
+                'updated_at': updated_at if updated_at is not None else file_record.updated_at,
+            },
+        )
+
     async def _get_user(self):
         """Fetch the user object for process_file access control."""
         user = await Users.get_user_by_id(self.user_id)
@@ -375,14 +597,48 @@ class BaseSyncWorker(ABC):
         return user
 
     async def _check_cancelled(self) -> bool:
-        """Check if sync has been cancelled by user."""
+        """Check if sync has been cancelled by user.
+
+        In-process cancels are read from the cancel event; knowledge meta is
+        re-read at most every ``CANCEL_POLL_INTERVAL`` seconds.
+        """
+        if self._cancel_observed or (self._cancel_event is not None and self._cancel_event.is_set()):
+            self._cancel_observed = True
+            return True
+
+        now = time.monotonic()
+        if self._cancel_polled_at is not None and now - self._cancel_polled_at < CANCEL_POLL_INTERVAL:
+            return False
+        self._cancel_polled_at = now
+
         knowledge = await Knowledges.get_knowledge_by_id(self.knowledge_id)
         if knowledge:
             meta = knowledge.meta or {}
             sync_info = meta.get(self.meta_key, {})
-            return sync_info.get('status') == 'cancelled'
+            if sync_info.get('status') == 'cancelled':
+                self._cancel_observed = True
+                return True
         return False
 
+    def _should_persist_progress(
+        self, status: str, current: int, total: int, error: Optional[str], stage_counts
+    ) -> bool:
+        """Whether a status update must be written to knowledge meta.
+
+        Non-progress updates (terminal states, errors, loader-worker stage
+        counts, the opening tick) always persist; plain 'syncing' ticks only
+        once progress crosses into a new ``total // STATUS_PERSIST_STEPS``
+        step since the last write, and on the last file. Step crossing
+        (rather than ``current % step``) keeps this correct when coalesced
+        progress skips values.
+        """
+        if status != 'syncing' or error or stage_counts or total <= 0:
+            return True
+        if self._persisted_progress is None or current >= total:
+            return True
+        step = max(1, total // STATUS_PERSIST_STEPS)
+        return current // step > self._persisted_progress // step
+
     async def _update_sync_status(
         self,
         status: str,
@@ -399,6 +655,8 @@ class BaseSyncWorker(ABC):
         files_removed: int = 0,
         failed_files: Optional[List[FailedFile]] = None,
         stage_counts: Optional[Dict[str, int]] = None,
+        last_result: Optional[Dict[str, Any]] = None,
+        save_sources: bool = False,
     ):
         """Update sync status in knowledge meta and emit Socket.IO event.
 
@@ -407,13 +665,25 @@ class BaseSyncWorker(ABC):
         can render "Added 5, Updated 2" instead of "Synced 7". When a caller
         omits them they default to 0; ``files_processed`` is preserved for
         backwards compatibility (and equals files_added + files_updated).
+
+        ``last_result`` (terminal updates only) is stored with ``last_sync_at``
+        in the same meta write as the status; ``save_sources`` likewise folds
+        in what ``_save_sources`` would write.
         """
-        knowledge = await Knowledges.get_knowledge_by_id(self.knowledge_id)
+        if not self._should_persist_progress(status, current, total, error, stage_counts):
+            # Skipped DB round-trip; still honour a cancel seen earlier in
+            # the run so the UI doesn't flip back to 'syncing'.
+            if status == 'syncing' and self._cancel_observed:
+                return
+            knowledge = None
+        else:
+            knowledge = await Knowledges.get_knowledge_by_id(self.knowledge_id)
         if knowledge:
             meta = knowledge.meta or {}
             sync_info = meta.get(self.meta_key, {})
             # Don't overwrite cancelled status with progress updates
             if sync_info.get('status') == 'cancelled' and status == 'syncing':
+                self._cancel_observed = True
                 return
             sync_info['status'] = status
             if status == 'syncing' and not sync_info.get('sync_started_at'):
@@ -424,8 +694,17 @@ class BaseSyncWorker(ABC):
                 sync_info['stage_counts'] = stage_counts
             if error:
                 sync_info['error'] = error
+            if last_result is not None:
+                sync_info['last_sync_at'] = int(time.time())
+                sync_info['last_result'] = last_result
+            if save_sources:
+                sources_json = self._sources_json()
+                sync_info['sources'] = self.sources
             meta[self.meta_key] = sync_info
-            await Knowledges.update_knowledge_meta_by_id(self.knowledge_id, meta)
+            updated = await Knowledges.update_knowledge_meta_by_id(self.knowledge_id, meta)
+            if save_sources and updated:
+                self._saved_sources_json = sources_json
+            self._persisted_progress = current if status == 'syncing' and total > 0 else None
 
         # Convert failed_files to dicts for serialization
         failed_files_dicts = [asdict(f) for f in failed_files] if failed_files else None
@@ -476,11 +755,22 @@ class BaseSyncWorker(ABC):
 
     def _get_content_type(self, filename: str) -> str:
         """Get MIME type from filename."""
-        ext = Path(filename).suffix.lower()
-        return CONTENT_TYPES.get(ext, 'application/octet-stream')
+        return content_type_for(filename) or 'application/octet-stream'
+
+    def _sources_json(self) -> str:
+        return json.dumps(self.sources, sort_keys=True, default=str)
 
     async def _save_sources(self):
-        """Save updated sources to knowledge metadata."""
+        """Save updated sources to knowledge metadata.
+
+        Skips the meta read + write when no source (delta link, folder map,
+        content hash, ...) changed since the last save.
+        """
+        sources_json = self._sources_json()
+        if sources_json == self._saved_sources_json:
+            log.debug(f'Sources unchanged for {self.knowledge_id}, skipping meta write')
+            return
+
         knowledge = await Knowledges.get_knowledge_by_id(self.knowledge_id)
         if not knowledge:
             return
@@ -490,7 +780,8 @@ class BaseSyncWorker(ABC):
         sync_info['sources'] = self.sources
         meta[self.meta_key] = sync_info
 
-        await Knowledges.update_knowledge_meta_by_id(self.knowledge_id, meta)
+        if await Knowledges.update_knowledge_meta_by_id(self.knowledge_id, meta):
+            self._saved_sources_json = sources_json
 
     async def _handle_deleted_item(self, item: Dict[str, Any]):
         """Handle a deleted item from changes query."""
@@ -521,6 +812,52 @@ class BaseSyncWorker(ABC):
             else:
                 log.info(f'File {file_id} still referenced by {len(remaining_refs)} KB(s), preserving')
 
+    async def _get_kb_files(self) -> List[FileModel]:
+        """Files in this KB, loaded on first use and reused for the rest of the sync."""
+        if self._kb_files is None:
+            self._kb_files = await Knowledges.get_files_by_id(self.knowledge_id) or []
+        return self._kb_files
+
+    async def _remove_files_from_kb(self, file_ids: List[str]) -> int:
+        """Bulk-remove files from this KB (revoked source), deleting orphans.
+
+        Batched counterpart of the per-file steps in ``_handle_deleted_item``:
+        one association DELETE, KB-collection vector deletes issued
+        concurrently (not every vector backend supports an ``$in`` filter),
+        one reference query to find orphans, and a single batch cleanup of
+        the orphaned File rows, storage objects and per-file collections.
+
+        Returns the number of files removed from the KB.
+        """
+        if not file_ids:
+            return 0
+
+        await Knowledges.remove_files_from_knowledge_by_ids(self.knowledge_id, file_ids)
+        if self._kb_files is not None:
+            removed = set(file_ids)
+            self._kb_files = [f for f in self._kb_files if f.id not in removed]
+
+        async def _delete_vectors(file_id: str) -> None:
+            try:
+                await ASYNC_VECTOR_DB_CLIENT.delete(
+                    collection_name=self.knowledge_id,
+                    filter={'file_id': file_id},
+                )
+            except Exception as e:
+                log.warning(f'Failed to remove vectors for {file_id}: {e}')
+
+        await asyncio.gather(*(_delete_vectors(file_id) for file_id in file_ids))
+
+        still_referenced = await Knowledges.get_referenced_file_ids(file_ids)
+        orphaned = [file_id for file_id in file_ids if file_id not in still_referenced]
+        if orphaned:
+            # force=True: the KB reference check was just done above, and like
+            # DeletionService.delete_file this cleanup ignores chat references.
+            # Per-item failures are logged by the DeletionReport.
+            await DeletionService.delete_orphaned_files_batch(orphaned, force=True)
+
+        return len(file_ids)
+
     async def _handle_revoked_item(self, file_id: str) -> int:
         """Remove a single file from this KB after the loader-worker reports
         its source access was permanently revoked. Mirrors
@@ -566,7 +903,31 @@ class BaseSyncWorker(ABC):
             log.debug(f'Failed to emit revoked-access deletion event: {e}')
         return 1
 
-    async def _classify_for_submit(self, file_info: Dict[str, Any]) -> tuple[str, str]:
+    async def _prefetch_existing_files(
+        self,
+        file_ids: List[str],
+        known: Optional[Dict[str, FileModel]] = None,
+    ) -> Dict[str, FileModel]:
+        """Bulk-load File rows for ``file_ids``, keyed by id.
+
+        ``known`` rows (e.g. the KB's current files, already loaded for the
+        file-limit check) are reused; only the remaining ids hit the DB, in
+        chunks of ``PREFETCH_CHUNK_SIZE``.
+        """
+        wanted = set(file_ids)
+        rows = {fid: row for fid, row in (known or {}).items() if fid in wanted}
+        missing = [fid for fid in dict.fromkeys(file_ids) if fid not in rows]
+        for i in range(0, len(missing), PREFETCH_CHUNK_SIZE):
+            for row in await Files.get_files_by_ids(missing[i : i + PREFETCH_CHUNK_SIZE]):
+                rows[row.id] = row
+        return rows
+
+    async def _classify_for_submit(
+        self,
+        file_info: Dict[str, Any],
+        prefetched: Optional[Dict[str, FileModel]] = None,
+        kb_file_ids: Optional[set[str]] = None,
+    ) -> tuple[str, str]:
         """Decide whether to submit this file_info to the loader-worker.
 
         Returns (category, file_id):
@@ -574,6 +935,11 @@ class BaseSyncWorker(ABC):
           - ('updated', file_id)   — existing row but hash mismatch or non-completed; SUBMIT
           - ('added', file_id)     — no existing row; SUBMIT
 
+        ``prefetched`` is the bulk-loaded row map from
+        ``_prefetch_existing_files``; when given, no per-file query is made.
+        ``kb_file_ids`` additionally requires an unchanged file to already be
+        linked to this KB (a row shared with another KB still needs linking).
+
         Mirrors the legacy short-circuit at ``_download_and_store_legacy``
         (the cloud-hash check around line 912-921) so the shared-loader path
         stops re-processing files that haven't changed — the structural cause
@@ -583,7 +949,10 @@ class BaseSyncWorker(ABC):
         item = file_info['item']
         item_id = item['id']
         file_id = f'{self.file_id_prefix}{item_id}'
-        existing = await Files.get_file_by_id(file_id)
+        if prefetched is not None:
+            existing = prefetched.get(file_id)
+        else:
+            existing = await Files.get_file_by_id(file_id)
         if existing is None:
             return 'added', file_id
         cloud_hash = self._get_cloud_hash(file_info)
@@ -595,6 +964,8 @@ class BaseSyncWorker(ABC):
         stored = (existing.meta or {}).get('cloud_hash')
         status = (existing.data or {}).get('status')
         if stored == cloud_hash and status == 'completed':
+            if kb_file_ids is not None and file_id not in kb_file_ids:
+                return 'updated', file_id
             return 'unchanged', file_id
         return 'updated', file_id
 
@@ -611,7 +982,7 @@ class BaseSyncWorker(ABC):
         try:
 
             def _check():
-                log.info(f'[sync:ensure:{file_id}] >>> KB QUERY START')
+                log.debug('[sync:ensure:%s] >>> KB QUERY START', file_id)
                 t0 = time.time()
 
                 # Check if vectors already exist in KB collection
@@ -629,8 +1000,8 @@ class BaseSyncWorker(ABC):
                     log.info(f'[sync:ensure:{file_id}] Cleaning up legacy per-file collection')
                     VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
 
-                log.info(
-                    f'[sync:ensure:{file_id}] <<< KB QUERY END ({time.time() - t0:.1f}s) has_vectors={has_vectors}'
+                log.debug(
+                    '[sync:ensure:%s] <<< KB QUERY END (%.1fs) has_vectors=%s', file_id, time.time() - t0, has_vectors
                 )
                 return has_vectors
 
@@ -682,7 +1053,7 @@ class BaseSyncWorker(ABC):
         if not file.path:
             raise ValueError(f'File {file_id} has no path')
 
-        local_file_path = Storage.get_file(file.path)
+        local_file_path = await asyncio.to_thread(Storage.get_file, file.path)
 
         def _extract_in_thread():
             loader = Loader(
@@ -758,11 +1129,15 @@ class BaseSyncWorker(ABC):
         file_hash: str,
         filename: str,
         needs_split: bool = True,
+        extra_collections: Sequence[str] = (),
     ) -> bool:
         """Embed documents once and insert vectors into both KB and per-file collections.
 
         This replaces the double process_file call by generating embeddings once
-        and writing the resulting vectors to both collections.
+        and writing the resulting vectors to both collections. Once the KB insert
+        has succeeded, the file's vectors in ``extra_collections`` (other KBs that
+        reference the file) are replaced with the same ones, so those KBs don't
+        re-extract and re-embed it.
         """
         import tiktoken
         from open_webui.retrieval.utils import get_embedding_function
@@ -842,7 +1217,7 @@ class BaseSyncWorker(ABC):
                 return False
 
             t_split = time.time()
-            log.info(f'[sync:{filename}] split: {len(working_docs)} chunks in {t_split - t0:.1f}s')
+            log.debug('[sync:%s] split: %d chunks in %.1fs', filename, len(working_docs), t_split - t0)
 
             texts = [sanitize_text_for_db(doc.page_content) for doc in working_docs]
             metadatas = [
@@ -890,7 +1265,7 @@ class BaseSyncWorker(ABC):
                 concurrent_requests=request.app.state.config.RAG_EMBEDDING_CONCURRENT_REQUESTS,
             )
 
-            log.info(f'[sync:{filename}] >>> EMBED START ({len(texts)} texts)')
+            log.debug('[sync:%s] >>> EMBED START (%d texts)', filename, len(texts))
             future = asyncio.run_coroutine_threadsafe(
                 embedding_function(
                     list(map(lambda x: x.replace('\n', ' '), texts)),
@@ -901,7 +1276,7 @@ class BaseSyncWorker(ABC):
             )
             embeddings = future.result(timeout=RAG_EMBEDDING_TIMEOUT)
             t_embed = time.time()
-            log.info(f'[sync:{filename}] <<< EMBED END ({t_embed - t_split:.1f}s)')
+            log.debug('[sync:%s] <<< EMBED END (%.1fs)', filename, t_embed - t_split)
 
             # Build vector items with separate UUIDs per collection
             items_kb = [
@@ -916,12 +1291,14 @@ class BaseSyncWorker(ABC):
 
             # Insert into KB collection (sync Weaviate calls — kept in thread
             # to avoid blocking the event loop)
-            log.info(f'[sync:{filename}] >>> WEAVIATE KB INSERT START ({len(items_kb)} vectors)')
+            log.debug('[sync:%s] >>> WEAVIATE KB INSERT START (%d vectors)', filename, len(items_kb))
             VECTOR_DB_CLIENT.insert(collection_name=self.knowledge_id, items=items_kb)
             t_kb = time.time()
-            log.info(f'[sync:{filename}] <<< WEAVIATE KB INSERT END ({t_kb - t_embed:.1f}s)')
+            log.debug('[sync:%s] <<< WEAVIATE KB INSERT END (%.1fs)', filename, t_kb - t_embed)
+
+            self._replace_file_vectors(extra_collections, file_id, items_kb)
 
-            log.info(f'[sync:{filename}] DONE total={t_kb - t0:.1f}s')
+            log.debug('[sync:%s] DONE total=%.1fs', filename, t_kb - t0)
             return True
 
         result = await asyncio.to_thread(_split_embed_and_store)
@@ -956,6 +1333,12 @@ class BaseSyncWorker(ABC):
             return None
         return await self._download_and_store_legacy(file_info)
 
+    async def _get_existing_file(self, file_id: str) -> Optional[FileModel]:
+        """File row for ``file_id``, from the sync's prefetch when it has one."""
+        if self._prefetched_files is not None:
+            return self._prefetched_files.get(file_id)
+        return await Files.get_file_by_id(file_id)
+
     async def _download_and_store_legacy(self, file_info: Dict[str, Any]) -> Union[PreparedFile, FailedFile, None]:
         """Phase 1: Download from cloud, check hash, upload to S3, create file record.
 
@@ -982,13 +1365,13 @@ class BaseSyncWorker(ABC):
         # Existing KBs without cloud_hash in meta will fall through to download,
         # populating cloud_hash for subsequent syncs (backward compatible).
         cloud_hash = self._get_cloud_hash(file_info)
-        existing = await Files.get_file_by_id(file_id)
+        existing = await self._get_existing_file(file_id)
 
         if cloud_hash and existing:
             existing_meta = existing.meta or {}
             stored_cloud_hash = existing_meta.get('cloud_hash')
             if stored_cloud_hash and stored_cloud_hash == cloud_hash:
-                log.info(f'File {file_id} unchanged (cloud hash match), skipping download')
+                log.debug('File %s unchanged (cloud hash match), skipping download', file_id)
 
                 new_relative_path = file_info.get('relative_path')
                 if new_relative_path and existing_meta.get('relative_path') != new_relative_path:
@@ -1003,12 +1386,13 @@ class BaseSyncWorker(ABC):
                     name=name,
                     content_hash=existing.hash,
                     is_new=False,
+                    file_record=existing,
                 )
 
-        log.info(f'Downloading file: {name} (id: {item_id})')
+        log.debug('Downloading file: %s (id: %s)', name, item_id)
 
-        await emit_file_processing(
-            self.event_prefix,
+        await self._emit(
+            emit_file_processing,
             user_id=self.user_id,
             knowledge_id=self.knowledge_id,
             file_info={
@@ -1020,18 +1404,28 @@ class BaseSyncWorker(ABC):
             },
         )
 
-        # Download file content
+        # Download file content (only the network fetch holds a download slot)
         try:
-            content = await self._download_file_content(file_info)
+            async with self._stage_gate(self._download_sem):
+                # The slot may have been queued for a while; don't start the
+                # download if the sync was cancelled meanwhile.
+                if await self._check_cancelled():
+                    return FailedFile(
+                        filename=name,
+                        error_type=SyncErrorType.PROCESSING_ERROR.value,
+                        error_message='Sync cancelled by user',
+                    )
+                spool, content_hash, size = await self._download_to_spool(file_info)
         except Exception as e:
             log.warning(f'Failed to download file {name}: {e}')
             return FailedFile(
                 filename=name,
                 error_type=SyncErrorType.DOWNLOAD_ERROR.value,
-                error_message=f'Download failed: {str(e)[:80]}',
+                error_message=f'Download failed: {_short_err(e, 80)}',
             )
 
-        if not content or len(content) == 0:
+        if size == 0:
+            spool.close()
             return FailedFile(
                 filename=name,
                 error_type=SyncErrorType.EMPTY_CONTENT.value,
@@ -1039,10 +1433,9 @@ class BaseSyncWorker(ABC):
             )
 
         # Post-download content hash check
-        content_hash = hashlib.sha256(content).hexdigest()
-
         if existing and existing.hash == content_hash:
-            log.info(f'File {file_id} unchanged (content hash match)')
+            spool.close()
+            log.debug('File %s unchanged (content hash match)', file_id)
 
             existing_meta = existing.meta or {}
             updated = False
@@ -1070,6 +1463,7 @@ class BaseSyncWorker(ABC):
                 name=name,
                 content_hash=content_hash,
                 is_new=False,
+                file_record=existing,
             )
 
         # Upload to storage
@@ -1081,8 +1475,13 @@ class BaseSyncWorker(ABC):
             }
             storage_headers.update(self._get_provider_storage_headers(item_id))
 
-            contents, file_path = Storage.upload_file(
-                io.BytesIO(content),
+            # Storage backends are synchronous (local disk / boto3 / GCS /
+            # Azure SDKs) — run off the event loop so concurrent downloads
+            # aren't stalled behind one file's upload. upload_stream copies
+            # the spool in chunks instead of reading the file into memory.
+            _, file_path = await asyncio.to_thread(
+                Storage.upload_stream,
+                spool,
                 temp_filename,
                 storage_headers,
             )
@@ -1090,8 +1489,10 @@ class BaseSyncWorker(ABC):
             return FailedFile(
                 filename=name,
                 error_type=SyncErrorType.PROCESSING_ERROR.value,
-                error_message=f'Storage upload failed: {str(e)[:80]}',
+                error_message=f'Storage upload failed: {_short_err(e, 80)}',
             )
+        finally:
+            spool.close()
 
         # Create/update file record
         try:
@@ -1102,7 +1503,7 @@ class BaseSyncWorker(ABC):
                 relative_path=relative_path,
                 name=name,
                 content_type=content_type,
-                size=len(content),
+                size=size,
                 file_info=file_info,
             )
 
@@ -1113,9 +1514,8 @@ class BaseSyncWorker(ABC):
             if existing:
                 await Files.update_file_by_id(
                     file_id,
-                    FileUpdateForm(hash=content_hash, meta=file_meta),
+                    FileUpdateForm(hash=content_hash, meta=file_meta, path=file_path),
                 )
-                await Files.update_file_path_by_id(file_id, file_path)
             else:
                 file_form = FileForm(
                     id=file_id,
@@ -1138,7 +1538,7 @@ class BaseSyncWorker(ABC):
             return FailedFile(
                 filename=name,
                 error_type=SyncErrorType.PROCESSING_ERROR.value,
-                error_message=str(e)[:100],
+                error_message=_short_err(e),
             )
 
     async def _process_and_embed(self, prepared: PreparedFile) -> Optional[FailedFile]:
@@ -1169,20 +1569,21 @@ class BaseSyncWorker(ABC):
 
         try:
             # Extract content (loader / external pipeline)
-            log.info(f'[sync:{name}] >>> EXTRACT START')
+            log.debug('[sync:%s] >>> EXTRACT START', name)
             t_start = time.time()
-            result = await self._extract_content(file_id)
+            async with self._stage_gate(self._process_sem):
+                result = await self._extract_content(file_id)
             t_extract = time.time()
 
             if result is None:
-                log.debug(f'File {file_id} has no extractable content')
+                log.debug('File %s has no extractable content', file_id)
                 return None
 
             docs, file_record, needs_split = result
-            log.info(f'[sync:{name}] <<< EXTRACT END ({len(docs)} docs, {t_extract - t_start:.1f}s)')
+            log.debug('[sync:%s] <<< EXTRACT END (%d docs, %.1fs)', name, len(docs), t_extract - t_start)
 
             if not docs or not any(doc.page_content.strip() for doc in docs):
-                log.debug(f'File {file_id} has no text content')
+                log.debug('File %s has no text content', file_id)
                 return None
 
             if await self._check_cancelled():
@@ -1192,14 +1593,20 @@ class BaseSyncWorker(ABC):
                     error_message='Sync cancelled by user',
                 )
 
+            # Other KBs referencing this file get the same vectors. Their
+            # stale ones are only replaced once the new embedding succeeds.
+            other_kb_ids = await self._get_other_kb_ids(file_id)
+
             # Embed once → insert into both KB and per-file collections
-            success = await self._embed_to_collections(
-                docs=docs,
-                file_id=file_id,
-                file_hash=prepared.content_hash,
-                filename=name,
-                needs_split=needs_split,
-            )
+            async with self._stage_gate(self._embed_sem):
+                success = await self._embed_to_collections(
+                    docs=docs,
+                    file_id=file_id,
+                    file_hash=prepared.content_hash,
+                    filename=name,
+                    needs_split=needs_split,
+                    extra_collections=other_kb_ids,
+                )
 
             if not success:
                 return FailedFile(
@@ -1213,7 +1620,7 @@ class BaseSyncWorker(ABC):
             return FailedFile(
                 filename=name,
                 error_type=SyncErrorType.PROCESSING_ERROR.value,
-                error_message=str(e)[:100],
+                error_message=_short_err(e),
             )
 
         if await self._check_cancelled():
@@ -1226,56 +1633,43 @@ class BaseSyncWorker(ABC):
         # KB association
         await Knowledges.add_file_to_knowledge_by_id(self.knowledge_id, file_id, self.user_id)
 
-        # Cross-KB vector propagation (still uses process_file for other KBs)
+        # Emit file added event. Build the payload from the record loaded in
+        # _extract_content plus the meta _embed_to_collections just wrote,
+        # instead of re-reading the row.
+        await self._emit_file_added(
+            file_record,
+            meta={**(file_record.meta or {}), 'collection_name': self.knowledge_id},
+            updated_at=int(time.time()),
+        )
+
+        return None
+
+    async def _get_other_kb_ids(self, file_id: str) -> List[str]:
+        """Ids of the other KBs that reference ``file_id`` and need its fresh vectors."""
         try:
             knowledge_files = await Knowledges.get_knowledge_files_by_file_id(file_id)
-            for kf in knowledge_files:
-                if kf.knowledge_id != self.knowledge_id:
-                    log.info(f'Propagating vectors for {file_id} to KB {kf.knowledge_id}')
-                    try:
-                        await ASYNC_VECTOR_DB_CLIENT.delete(
-                            collection_name=kf.knowledge_id,
-                            filter={'file_id': file_id},
-                        )
-                    except Exception as e:
-                        log.warning(f'Failed to remove old vectors from KB {kf.knowledge_id}: {e}')
-                    try:
-                        from open_webui.routers.retrieval import process_file, ProcessFileForm
-
-                        propagate_user = await self._get_user()
-
-                        async with get_async_db() as db:
-                            await process_file(
-                                self._make_request(),
-                                ProcessFileForm(
-                                    file_id=file_id,
-                                    collection_name=kf.knowledge_id,
-                                ),
-                                user=propagate_user,
-                                db=db,
-                            )
-                    except Exception as e:
-                        log.warning(f'Failed to propagate vectors to KB {kf.knowledge_id}: {e}')
         except Exception as e:
             log.warning(f'Failed to propagate vector updates for {file_id}: {e}')
+            return []
+        return [kf.knowledge_id for kf in knowledge_files if kf.knowledge_id != self.knowledge_id]
 
-        # Emit file added event
-        file_record = await Files.get_file_by_id(file_id)
-        if file_record:
-            await emit_file_added(
-                self.event_prefix,
-                user_id=self.user_id,
-                knowledge_id=self.knowledge_id,
-                file_data={
-                    'id': file_record.id,
-                    'filename': file_record.filename,
-                    'meta': file_record.meta,
-                    'created_at': file_record.created_at,
-                    'updated_at': file_record.updated_at,
-                },
-            )
+    def _replace_file_vectors(self, collection_names: Sequence[str], file_id: str, items: List[Dict[str, Any]]) -> None:
+        """Swap ``file_id``'s vectors in each of ``collection_names`` for ``items``.
 
-        return None
+        Runs in the embedding thread after the KB insert, so a failed or
+        cancelled embed leaves the other KBs with their previous vectors.
+        Each collection gets fresh vector ids.
+        """
+        for collection_name in collection_names:
+            log.info('Propagating vectors for %s to KB %s', file_id, collection_name)
+            try:
+                VECTOR_DB_CLIENT.delete(collection_name=collection_name, filter={'file_id': file_id})
+                VECTOR_DB_CLIENT.insert(
+                    collection_name=collection_name,
+                    items=[{**item, 'id': str(uuid.uuid4())} for item in items],
+                )
+            except Exception as e:
+                log.warning(f'Failed to propagate vectors to KB {collection_name}: {e}')
 
     # ------------------------------------------------------------------
     # Shared-loader orchestration (USE_SHARED_LOADER=true)
@@ -1351,6 +1745,27 @@ class BaseSyncWorker(ABC):
         log.info(f'Submitted loader-worker job {job_id} for KB {self.knowledge_id} with {len(items)} items')
         return job_id
 
+    async def _insert_stub_rows(self, new_forms: List[FileForm], file_ids: List[str]) -> None:
+        """Insert stub ``Files`` rows and attach ``file_ids`` to the KB in bulk.
+
+        Both go in one commit per ``PREFETCH_CHUNK_SIZE`` chunk. If a chunk
+        fails (e.g. a row or link raced in from another sync) it is retried
+        per row, so one conflict doesn't drop the whole chunk.
+        """
+        for i in range(0, len(new_forms), PREFETCH_CHUNK_SIZE):
+            chunk = new_forms[i : i + PREFETCH_CHUNK_SIZE]
+            if await Files.insert_new_files(self.user_id, chunk):
+                continue
+            for file_form in chunk:
+                await Files.insert_new_file(self.user_id, file_form)
+
+        for i in range(0, len(file_ids), PREFETCH_CHUNK_SIZE):
+            chunk = file_ids[i : i + PREFETCH_CHUNK_SIZE]
+            if await Knowledges.add_files_to_knowledge_by_ids(self.knowledge_id, chunk, self.user_id) is not None:
+                continue
+            for file_id in chunk:
+                await Knowledges.add_file_to_knowledge_by_id(self.knowledge_id, file_id, self.user_id)
+
     async def _create_stub_file_rows(self, files: List[Dict[str, Any]]) -> list[str]:
         """Insert ``Files`` rows in ``status='pending'`` for every discovered file.
 
@@ -1369,6 +1784,12 @@ class BaseSyncWorker(ABC):
         transitioned out of ``pending``.
         """
         touched: list[str] = []
+        events: list[Dict[str, Any]] = []
+        # Existence comes from the rows bulk-loaded in ``sync()``; KB links
+        # are inserted in bulk below instead of one INSERT + commit per file.
+        prefetched = self._prefetched_files
+        inserted: set[str] = set()
+        new_forms: list[FileForm] = []
         for file_info in files:
             try:
                 item = file_info['item']
@@ -1379,10 +1800,11 @@ class BaseSyncWorker(ABC):
                 relative_path = file_info.get('relative_path', name)
                 content_type = self._get_content_type(name)
 
-                if await Files.get_file_by_id(file_id) is not None:
-                    await Knowledges.add_file_to_knowledge_by_id(self.knowledge_id, file_id, self.user_id)
-                    touched.append(file_id)
+                if prefetched is not None:
+                    exists = file_id in prefetched or file_id in inserted
                 else:
+                    exists = await Files.get_file_by_id(file_id) is not None
+                if not exists:
                     # Google Drive returns ``size`` as a string per its v3 API
                     # (``files.list``). Storing that raw makes the frontend's
                     # formatFileSize show "Invalid size" because it requires
@@ -1411,27 +1833,34 @@ class BaseSyncWorker(ABC):
                         data={'status': 'pending'},
                         meta=file_meta,
                     )
-                    await Files.insert_new_file(self.user_id, file_form)
-                    await Knowledges.add_file_to_knowledge_by_id(self.knowledge_id, file_id, self.user_id)
-                    touched.append(file_id)
-
-                await emit_file_processing(
-                    self.event_prefix,
-                    user_id=self.user_id,
-                    knowledge_id=self.knowledge_id,
-                    file_info={
+                    new_forms.append(file_form)
+                    inserted.add(file_id)
+                touched.append(file_id)
+
+                events.append(
+                    {
                         'item_id': item_id,
                         'name': name,
                         'size': item.get('size', 0),
                         'source_item_id': source_item_id,
                         'relative_path': relative_path,
-                    },
+                    }
                 )
             except Exception as e:
                 # Stub creation is best-effort UI hint — never let a failure
                 # here block the actual sync. The /ingest callback will
                 # create the row from scratch if the stub is missing.
                 log.warning(f'Failed to create stub File row for {file_info.get("name", "?")}: {e}')
+
+        await self._insert_stub_rows(new_forms, touched)
+
+        for event_file_info in events:
+            await emit_file_processing(
+                self.event_prefix,
+                user_id=self.user_id,
+                knowledge_id=self.knowledge_id,
+                file_info=event_file_info,
+            )
         return touched
 
     async def _fail_mark_outstanding_stubs(
@@ -1448,7 +1877,7 @@ class BaseSyncWorker(ABC):
 
         Returns the number of rows changed.
         """
-        file_ids = getattr(self, '_current_job_stub_file_ids', None) or []
+        file_ids = self._current_job_stub_file_ids
         if not file_ids:
             return 0
         changed = 0
@@ -1504,18 +1933,7 @@ class BaseSyncWorker(ABC):
                     self._announced_ok_file_ids.add(file_id)
                     refreshed = await Files.get_file_by_id(file_id)
                     if refreshed:
-                        await emit_file_added(
-                            self.event_prefix,
-                            user_id=self.user_id,
-                            knowledge_id=self.knowledge_id,
-                            file_data={
-                                'id': refreshed.id,
-                                'filename': refreshed.filename,
-                                'meta': refreshed.meta,
-                                'created_at': refreshed.created_at,
-                                'updated_at': refreshed.updated_at,
-                            },
-                        )
+                        await self._emit_file_added(refreshed)
             except Exception as e:
                 log.debug(f'Failed to mirror loader-worker stage onto File {file_id}: {e}')
 
@@ -1701,7 +2119,31 @@ class BaseSyncWorker(ABC):
         revoked_count = 0
         revoked_file_ids: set[str] = set()
 
-        for err in status.get('errors', []) or []:
+        # Failed items (display name) and orphan-stage stubs (fail-mark) are
+        # resolved against one bulk File load instead of a SELECT per item.
+        errors = status.get('errors', []) or []
+        non_terminal_stages = {'pending', 'downloading', 'parsing', 'ingesting'}
+        lookup_ids = [
+            err['file_id'] for err in errors if err.get('file_id') and err.get('error_code') != 'source_access_revoked'
+        ]
+        if terminal != 'cancelled':
+            lookup_ids += [
+                item['file_id']
+                for item in status.get('items') or []
+                if item.get('file_id') and item.get('stage') in non_terminal_stages
+            ]
+        try:
+            result_rows: Optional[Dict[str, FileModel]] = await self._prefetch_existing_files(lookup_ids)
+        except Exception:
+            log.warning(f'Bulk File lookup failed for job {job_id}; falling back to per-item reads', exc_info=True)
+            result_rows = None
+
+        async def _lookup(file_id: str) -> Optional[FileModel]:
+            if result_rows is not None:
+                return result_rows.get(file_id)
+            return await Files.get_file_by_id(file_id)
+
+        for err in errors:
             code = err.get('error_code') or 'unexpected_error'
             file_id = err.get('file_id', 'unknown')
 
@@ -1734,7 +2176,7 @@ class BaseSyncWorker(ABC):
             display_name = file_id
             if file_id and file_id != 'unknown':
                 try:
-                    existing = await Files.get_file_by_id(file_id)
+                    existing = await _lookup(file_id)
                     if existing and existing.filename:
                         display_name = existing.filename
                 except Exception:
@@ -1767,7 +2209,6 @@ class BaseSyncWorker(ABC):
         # don't sit forever with a spinner. Skipped on cancellation, which is
         # handled below.
         if terminal != 'cancelled':
-            non_terminal_stages = {'pending', 'downloading', 'parsing', 'ingesting'}
             for orphan in status.get('items') or []:
                 if orphan.get('stage') not in non_terminal_stages:
                     continue
@@ -1779,7 +2220,7 @@ class BaseSyncWorker(ABC):
                     # longer exists and re-fail-marking would race a 404.
                     continue
                 try:
-                    existing = await Files.get_file_by_id(file_id)
+                    existing = await _lookup(file_id)
                     if existing and (existing.data or {}).get('status') not in ('completed', 'error'):
                         await Files.update_file_data_by_id(
                             file_id,
@@ -1882,8 +2323,9 @@ class BaseSyncWorker(ABC):
         retryable_codes = {
             (e.get('error_code') or 'unexpected_error') for e in (status.get('errors') or [])
         } - _NON_RETRYABLE_LOADER_ERROR_CODES
-        if terminal in ('completed', 'partial') and not retryable_codes:
-            await self._save_sources()
+        # Sources are persisted with the final status below (one meta write).
+        advance_cursor = terminal in ('completed', 'partial') and not retryable_codes
+        if advance_cursor:
             if total_failed:
                 log.info(
                     f'Advancing delta cursor for {self.knowledge_id} despite {total_failed} non-retryable failure(s).'
@@ -1897,27 +2339,9 @@ class BaseSyncWorker(ABC):
             )
 
         failed_files_dicts = [asdict(f) for f in failed_files]
-        knowledge = await Knowledges.get_knowledge_by_id(self.knowledge_id)
-        meta = knowledge.meta or {}
-        sync_info = meta.get(self.meta_key, {})
-        sync_info['last_sync_at'] = int(time.time())
-        sync_info['status'] = 'completed' if total_failed == 0 else 'completed_with_errors'
-        sync_info['last_result'] = {
-            'files_processed': total_processed,
-            'files_failed': total_failed,
-            'total_found': total_files,
-            'deleted_count': total_deleted,
-            'files_added': final_added,
-            'files_updated': final_updated,
-            'files_unchanged': final_unchanged,
-            'files_removed': total_deleted,
-            'failed_files': failed_files_dicts,
-        }
-        meta[self.meta_key] = sync_info
-        await Knowledges.update_knowledge_meta_by_id(self.knowledge_id, meta)
-
+        # last_result rides along with the terminal status: one meta write.
         await self._update_sync_status(
-            sync_info['status'],
+            'completed' if total_failed == 0 else 'completed_with_errors',
             current=total_files,
             total=total_files,
             files_processed=total_processed,
@@ -1928,6 +2352,18 @@ class BaseSyncWorker(ABC):
             files_unchanged=final_unchanged,
             files_removed=total_deleted,
             failed_files=failed_files,
+            last_result={
+                'files_processed': total_processed,
+                'files_failed': total_failed,
+                'total_found': total_files,
+                'deleted_count': total_deleted,
+                'files_added': final_added,
+                'files_updated': final_updated,
+                'files_unchanged': final_unchanged,
+                'files_removed': total_deleted,
+                'failed_files': failed_files_dicts,
+            },
+            save_sources=advance_cursor,
         )
 
         log.info(
@@ -1948,463 +2384,505 @@ class BaseSyncWorker(ABC):
             'failed_files': failed_files_dicts,
         }
 
-    async def sync(self) -> Dict[str, Any]:
-        """Execute sync operation for all sources."""
-        self._client = self._create_client()
-
-        try:
-            await self._update_sync_status('syncing', 0, 0)
-
-            # Verify the owner still has access; may suspend the KB
-            await self._sync_permissions()
+    async def _is_suspended(self) -> bool:
+        """Whether the KB carries a ``suspended_at`` marker (set by ``_sync_permissions``)."""
+        knowledge = await Knowledges.get_knowledge_by_id(self.knowledge_id)
+        if not knowledge:
+            return False
+        sync_info = (knowledge.meta or {}).get(self.meta_key, {})
+        return bool(sync_info.get('suspended_at'))
 
-            # Check if KB was suspended by _sync_permissions()
-            knowledge = await Knowledges.get_knowledge_by_id(self.knowledge_id)
-            if knowledge:
-                meta = knowledge.meta or {}
-                sync_info = meta.get(self.meta_key, {})
-                if sync_info.get('suspended_at'):
-                    log.info(f'KB {self.knowledge_id} is suspended, skipping sync')
-                    return {
-                        'files_processed': 0,
-                        'files_failed': 0,
-                        'total_found': 0,
-                        'deleted_count': 0,
-                        'failed_files': [],
-                        'suspended': True,
-                    }
+    async def _drop_revoked_sources(self) -> None:
+        """Verify access to each source; clean up and drop the revoked ones.
 
-            # Verify access to each source before syncing
-            verified_sources = []
-            revoked_sources = []
+        Each check is one provider round-trip, so they are fanned out (or
+        batched) instead of paid back to back.
+        """
+        access = await self._verify_sources_access(self.sources)
+        verified_sources = []
+        for source, has_access in zip(self.sources, access):
+            if has_access:
+                verified_sources.append(source)
+                continue
+            removed = await self._handle_revoked_source(source)
+            await self._update_sync_status(
+                'access_revoked',
+                error=(f"Access to '{source.get('name', 'unknown')}' has been revoked. {removed} file(s) removed."),
+            )
+        self.sources = verified_sources
 
-            for source in self.sources:
-                has_access = await self._verify_source_access(source)
-                if has_access:
-                    verified_sources.append(source)
-                else:
-                    revoked_sources.append(source)
+    async def _collect_sources(self) -> Tuple[List[Dict[str, Any]], int]:
+        """Files to sync across all sources, plus the count deleted at the source.
 
-            # Handle revoked sources
-            total_revoked_files = 0
-            for source in revoked_sources:
-                removed = await self._handle_revoked_source(source)
-                total_revoked_files += removed
+        Sources are enumerated concurrently (delta queries / item lookups are
+        independent), then aggregated in source order.
+        """
+        semaphore = asyncio.Semaphore(SOURCE_FANOUT_CONCURRENCY)
 
-                await self._update_sync_status(
-                    'access_revoked',
-                    error=(f"Access to '{source.get('name', 'unknown')}' has been revoked. {removed} file(s) removed."),
-                )
+        async def _collect(source: Dict[str, Any]):
+            async with semaphore:
+                if source.get('type') == 'folder':
+                    return await self._collect_folder_files(source)
+                file_info = await self._collect_single_file(source)
+                return ([file_info] if file_info else []), 0
+
+        all_files: List[Dict[str, Any]] = []
+        total_deleted = 0
+        for files, deleted in await asyncio.gather(*(_collect(source) for source in self.sources)):
+            all_files.extend(files)
+            total_deleted += deleted
+        return all_files, total_deleted
+
+    async def _apply_file_limit(
+        self, files: List[Dict[str, Any]], current_file_count: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Trim ``files`` to the KB's free file slots.
+
+        Returns None (after setting 'file_limit_exceeded') when there are none.
+        """
+        # A falsy max_files_config (0/None) means the provider sets no
+        # per-sync cap — fall back to the KB-wide KNOWLEDGE_MAX_FILE_COUNT
+        # safety net alone.
+        max_files = (
+            min(self.max_files_config, KNOWLEDGE_MAX_FILE_COUNT) if self.max_files_config else KNOWLEDGE_MAX_FILE_COUNT
+        )
+        available_slots = max(0, max_files - current_file_count)
+        if len(files) <= available_slots:
+            return files
 
-            self.sources = verified_sources
+        log.warning(f'File limit exceeded: {current_file_count} existing + {len(files)} new > {max_files} limit')
+        if available_slots == 0:
+            await self._update_sync_status(
+                'file_limit_exceeded',
+                error=(
+                    f'This knowledge base has reached the {max_files}-file limit. '
+                    f'Remove files or select fewer items to sync.'
+                ),
+            )
+            return None
+        await self._update_sync_status(
+            'syncing',
+            error=(f'Only syncing {available_slots} of {len(files)} files due to {max_files}-file limit.'),
+        )
+        return files[:available_slots]
 
-            # Aggregate counters
-            total_processed = 0
-            total_failed = 0
-            total_deleted = 0
-            failed_files: List[FailedFile] = []
+    async def _classify_files(
+        self, files: List[Dict[str, Any]], current_files: List[FileModel]
+    ) -> Tuple[List[Dict[str, Any]], set[str], set[str], int]:
+        """Split ``files`` into added / updated / unchanged before submission.
 
-            all_files_to_process = []
+        This lets the toast report what actually changed, not just what
+        passed through the loader-worker. The legacy in-pod path had a
+        per-file short-circuit at `_download_and_store_legacy`; the
+        shared-loader path lacked one, which is the structural cause of the
+        "5 extra" re-sync toast.
 
-            log.info(f'Starting multi-source sync for knowledge {self.knowledge_id}, {len(self.sources)} sources')
+        Rows are loaded in bulk up front (the KB's current files are already
+        in hand from the limit check) so classification and the legacy
+        download stage don't issue one SELECT per file.
 
-            for source in self.sources:
-                if source.get('type') == 'folder':
-                    files, deleted = await self._collect_folder_files(source)
-                    all_files_to_process.extend(files)
-                    total_deleted += deleted
-                else:
-                    file_info = await self._collect_single_file(source)
-                    if file_info:
-                        all_files_to_process.append(file_info)
-
-            # Apply file count limit. A falsy max_files_config (0/None) means
-            # the provider sets no per-sync cap — fall back to the KB-wide
-            # KNOWLEDGE_MAX_FILE_COUNT safety net alone.
-            max_files = (
-                min(self.max_files_config, KNOWLEDGE_MAX_FILE_COUNT)
-                if self.max_files_config
-                else KNOWLEDGE_MAX_FILE_COUNT
+        Returns the files to submit, the added and updated file ids, and the
+        unchanged count.
+        """
+        kb_files = {f.id: f for f in current_files}
+        kb_file_ids = set(kb_files)
+        self._prefetched_files = await self._prefetch_existing_files(
+            [f'{self.file_id_prefix}{fi["item"]["id"]}' for fi in files],
+            known=kb_files,
+        )
+        added_file_ids: set[str] = set()
+        updated_file_ids: set[str] = set()
+        unchanged_count = 0
+        to_submit: List[Dict[str, Any]] = []
+        for fi in files:
+            cat, fid = await self._classify_for_submit(
+                fi,
+                prefetched=self._prefetched_files,
+                kb_file_ids=kb_file_ids,
             )
-            current_files = await Knowledges.get_files_by_id(self.knowledge_id) or []
-            current_file_count = len(current_files)
-            available_slots = max(0, max_files - current_file_count)
-
-            if len(all_files_to_process) > available_slots:
-                log.warning(
-                    f'File limit exceeded: {current_file_count} existing + '
-                    f'{len(all_files_to_process)} new > {max_files} limit'
-                )
-                if available_slots == 0:
-                    await self._update_sync_status(
-                        'file_limit_exceeded',
-                        error=(
-                            f'This knowledge base has reached the {max_files}-file limit. '
-                            f'Remove files or select fewer items to sync.'
-                        ),
-                    )
-                    await self._save_sources()
-                    return {
-                        'files_processed': 0,
-                        'files_failed': 0,
-                        'total_found': len(all_files_to_process),
-                        'deleted_count': total_deleted,
-                        'failed_files': [],
-                        'file_limit_exceeded': True,
-                    }
-                else:
-                    total_found = len(all_files_to_process)
-                    all_files_to_process = all_files_to_process[:available_slots]
-                    await self._update_sync_status(
-                        'syncing',
-                        error=(f'Only syncing {available_slots} of {total_found} files due to {max_files}-file limit.'),
-                    )
-
-            # Categorize discovered files before submission so the toast can
-            # report what actually changed (added/updated/unchanged), not just
-            # what passed through the loader-worker. The legacy in-pod path
-            # had a per-file short-circuit at `_download_and_store_legacy`;
-            # the shared-loader path lacked one, which is the structural
-            # cause of the "5 extra" re-sync toast.
-            added_file_ids: set[str] = set()
-            updated_file_ids: set[str] = set()
-            unchanged_count = 0
-            to_submit: List[Dict[str, Any]] = []
-            for fi in all_files_to_process:
-                cat, fid = await self._classify_for_submit(fi)
-                if cat == 'unchanged':
-                    unchanged_count += 1
-                    continue
-                if cat == 'added':
-                    added_file_ids.add(fid)
-                else:
-                    updated_file_ids.add(fid)
-                to_submit.append(fi)
+            if cat == 'unchanged':
+                unchanged_count += 1
+                continue
+            if cat == 'added':
+                added_file_ids.add(fid)
+            else:
+                updated_file_ids.add(fid)
+            to_submit.append(fi)
 
-            all_files_to_process = to_submit
-            total_files = len(all_files_to_process) + unchanged_count
-            log.info(
-                f'Classified {len(all_files_to_process) + unchanged_count} files: '
-                f'{len(added_file_ids)} added, {len(updated_file_ids)} updated, '
-                f'{unchanged_count} unchanged'
-            )
+        log.info(
+            f'Classified {len(to_submit) + unchanged_count} files: '
+            f'{len(added_file_ids)} added, {len(updated_file_ids)} updated, '
+            f'{unchanged_count} unchanged'
+        )
+        return to_submit, added_file_ids, updated_file_ids, unchanged_count
 
-            # Pre-create the KB collection so individual file inserts don't
-            # race to create it (avoids N-1 wasted 422 roundtrips).
-            await ASYNC_VECTOR_DB_CLIENT.insert(collection_name=self.knowledge_id, items=[])
+    # ------------------------------------------------------------------
+    # Legacy in-pod pipeline
+    # ------------------------------------------------------------------
 
-            # USE_SHARED_LOADER branch: delegate everything to the per-tenant
-            # loader-worker pod. The semaphore-bounded fan-out below is bypassed.
-            if self._use_shared_loader and self._pipeline_client:
-                return await self._sync_via_pipeline(
-                    all_files_to_process=all_files_to_process,
-                    total_files=total_files,
-                    added_file_ids=added_file_ids,
-                    updated_file_ids=updated_file_ids,
-                    unchanged_count=unchanged_count,
-                    total_deleted=total_deleted,
-                )
+    def _init_stage_gates(self, file_count: int) -> int:
+        """Size the legacy pipeline's per-stage semaphores.
 
-            # Process all files with two-phase pipeline
-            from open_webui.config import FILE_DOWNLOAD_CONCURRENCY_MULTIPLIER
+        Returns the admission bound: how many file tasks may exist at once.
+        """
+        from open_webui.config import FILE_DOWNLOAD_CONCURRENCY_MULTIPLIER
+
+        # Cap process concurrency to the default thread pool size
+        # (min(32, os.cpu_count() + 4)) minus headroom for embedding
+        # callbacks. On a 1-CPU pod the pool is only 5 threads; allowing
+        # more concurrent process tasks than pool slots causes starvation.
+        thread_pool_size = min(32, (os.cpu_count() or 1) + 4)
+        max_process_concurrent = min(
+            FILE_PROCESSING_MAX_CONCURRENT.value,
+            max(1, thread_pool_size - 2),  # leave 2 slots for embeddings / other work
+        )
+        # Extraction and embedding each hold a thread while they run;
+        # the embed gate gets whatever the extract gate leaves of the
+        # same thread budget (at least one slot).
+        max_embed_concurrent = max(
+            1,
+            min(max_process_concurrent, thread_pool_size - 2 - max_process_concurrent),
+        )
+        max_download_concurrent = max_process_concurrent * FILE_DOWNLOAD_CONCURRENCY_MULTIPLIER
+        self._download_sem = asyncio.Semaphore(max_download_concurrent)
+        self._process_sem = asyncio.Semaphore(max_process_concurrent)
+        self._embed_sem = asyncio.Semaphore(max_embed_concurrent)
 
-            # Cap process concurrency to the default thread pool size
-            # (min(32, os.cpu_count() + 4)) minus headroom for embedding
-            # callbacks. On a 1-CPU pod the pool is only 5 threads; allowing
-            # more concurrent process tasks than pool slots causes starvation.
-            import os
+        log.info(
+            f'Starting pipeline processing of {file_count} files '
+            f'(thread pool: {thread_pool_size}, '
+            f'download concurrency: {max_download_concurrent}, '
+            f'process concurrency: {max_process_concurrent}, '
+            f'embed concurrency: {max_embed_concurrent})'
+        )
+        return max_download_concurrent + max_process_concurrent + max_embed_concurrent
 
-            thread_pool_size = min(32, (os.cpu_count() or 1) + 4)
-            max_process_concurrent = min(
-                FILE_PROCESSING_MAX_CONCURRENT.value,
-                max(1, thread_pool_size - 2),  # leave 2 slots for embeddings / other work
+    def _record_result(self, run: _LegacyRun, file_info: Dict[str, Any], ok: bool) -> None:
+        """Count one finished file and mark progress dirty for the publisher."""
+        if ok:
+            run.processed += 1
+        else:
+            run.failed += 1
+        run.last_filename = file_info.get('name', '')
+        done = run.processed + run.failed
+        if done % PROGRESS_LOG_INTERVAL == 0 or done == run.total_files:
+            log.info(
+                f'Sync progress for {self.knowledge_id}: {done}/{run.total_files} '
+                f'(processed={run.processed}, failed={run.failed})'
             )
-            max_download_concurrent = max_process_concurrent * FILE_DOWNLOAD_CONCURRENCY_MULTIPLIER
-            download_semaphore = asyncio.Semaphore(max_download_concurrent)
-            process_semaphore = asyncio.Semaphore(max_process_concurrent)
-            processed_count = unchanged_count
-            failed_count = 0
-            results_lock = asyncio.Lock()
-            cancelled = False
-
-            # Per-file timeout: extraction (120s) + chunking (120s) + embedding (300s) + overhead
-            FILE_PIPELINE_TIMEOUT = 600  # 10 minutes
-
-            async def _pipeline_inner(file_info: Dict[str, Any], index: int) -> Optional[FailedFile]:
-                nonlocal processed_count, failed_count, cancelled
-
-                if cancelled or await self._check_cancelled():
-                    cancelled = True
-                    return FailedFile(
-                        filename=file_info.get('name', 'unknown'),
-                        error_type=SyncErrorType.PROCESSING_ERROR.value,
-                        error_message='Sync cancelled by user',
-                    )
+        run.progress_dirty.set()
 
-                try:
-                    # Phase 1: Download + store (high concurrency)
-                    async with download_semaphore:
-                        if cancelled or await self._check_cancelled():
-                            cancelled = True
-                            return FailedFile(
-                                filename=file_info.get('name', 'unknown'),
-                                error_type=SyncErrorType.PROCESSING_ERROR.value,
-                                error_message='Sync cancelled by user',
-                            )
-                        result = await self._download_and_store(file_info)
-
-                    # Handle download phase results
-                    if isinstance(result, FailedFile):
-                        async with results_lock:
-                            failed_count += 1
-                            await self._update_sync_status(
-                                'syncing',
-                                processed_count + failed_count,
-                                total_files,
-                                file_info.get('name', ''),
-                                files_processed=processed_count,
-                                files_failed=failed_count,
-                            )
-                        return result
-
-                    if result is None:
-                        # Hash match — already handled, count as success
-                        async with results_lock:
-                            processed_count += 1
-                            await self._update_sync_status(
-                                'syncing',
-                                processed_count + failed_count,
-                                total_files,
-                                file_info.get('name', ''),
-                                files_processed=processed_count,
-                                files_failed=failed_count,
-                            )
-                        return None
-
-                    # Phase 2: Process + embed (normal concurrency)
-                    async with process_semaphore:
-                        if cancelled or await self._check_cancelled():
-                            cancelled = True
-                            return FailedFile(
-                                filename=file_info.get('name', 'unknown'),
-                                error_type=SyncErrorType.PROCESSING_ERROR.value,
-                                error_message='Sync cancelled by user',
-                            )
-
-                        if not result.is_new:
-                            # Hash-matched file: just verify vectors are in KB
-                            verify_result = await self._ensure_vectors_in_kb(result.file_id)
-                            if verify_result:
-                                if verify_result.error_type == SyncErrorType.EMPTY_CONTENT.value:
-                                    process_result = None  # Skip, not failure
-                                else:
-                                    log.warning(f'File {result.file_id} vectors missing, re-processing')
-                                    process_result = await self._process_and_embed(result)
-                            else:
-                                # Vectors verified, emit file added event
-                                file_record = await Files.get_file_by_id(result.file_id)
-                                if file_record:
-                                    await emit_file_added(
-                                        self.event_prefix,
-                                        user_id=self.user_id,
-                                        knowledge_id=self.knowledge_id,
-                                        file_data={
-                                            'id': file_record.id,
-                                            'filename': file_record.filename,
-                                            'meta': file_record.meta,
-                                            'created_at': file_record.created_at,
-                                            'updated_at': file_record.updated_at,
-                                        },
-                                    )
-                                process_result = None
-                        else:
-                            process_result = await self._process_and_embed(result)
-
-                    async with results_lock:
-                        if process_result is None:
-                            processed_count += 1
-                        else:
-                            failed_count += 1
-                        await self._update_sync_status(
-                            'syncing',
-                            processed_count + failed_count,
-                            total_files,
-                            file_info.get('name', ''),
-                            files_processed=processed_count,
-                            files_failed=failed_count,
-                        )
-                    return process_result
-
-                except Exception as e:
-                    log.error(f'Error in pipeline for {file_info.get("name")}: {e}')
-                    async with results_lock:
-                        failed_count += 1
-                    return FailedFile(
-                        filename=file_info.get('name', 'unknown'),
-                        error_type=SyncErrorType.PROCESSING_ERROR.value,
-                        error_message=str(e)[:100],
-                    )
-
-            async def pipeline(file_info: Dict[str, Any], index: int) -> Optional[FailedFile]:
-                """Wrapper that enforces a per-file timeout to prevent indefinite hangs."""
-                nonlocal failed_count
-                try:
-                    return await asyncio.wait_for(
-                        _pipeline_inner(file_info, index),
-                        timeout=FILE_PIPELINE_TIMEOUT,
-                    )
-                except asyncio.TimeoutError:
-                    log.error(f'File {file_info.get("name")} timed out after {FILE_PIPELINE_TIMEOUT}s')
-                    async with results_lock:
-                        failed_count += 1
-                    return FailedFile(
-                        filename=file_info.get('name', 'unknown'),
-                        error_type=SyncErrorType.PROCESSING_ERROR.value,
-                        error_message=f'Timed out after {FILE_PIPELINE_TIMEOUT}s',
-                    )
+    async def _publish_progress(self, run: _LegacyRun) -> None:
+        """Coalesce per-file completions into at most one status update per interval.
 
-            log.info(
-                f'Starting pipeline processing of {len(all_files_to_process)} files '
-                f'(thread pool: {thread_pool_size}, '
-                f'download concurrency: {max_download_concurrent}, '
-                f'process concurrency: {max_process_concurrent})'
-            )
-            start_time = time.time()
+        Exits once ``run.finished`` is set and the final counters are flushed.
+        """
+        while True:
+            await run.progress_dirty.wait()
+            if not run.finished:
+                await asyncio.sleep(PROGRESS_PUBLISH_INTERVAL)
+            run.progress_dirty.clear()
+            try:
+                await self._update_sync_status(
+                    'syncing',
+                    run.processed + run.failed,
+                    run.total_files,
+                    run.last_filename,
+                    files_processed=run.processed,
+                    files_failed=run.failed,
+                )
+            except Exception as e:
+                log.warning(f'Failed to publish sync progress: {e}')
+            if run.finished and not run.progress_dirty.is_set():
+                return
 
-            batch_size = max_download_concurrent + max_process_concurrent
-            total_batches = -(-len(all_files_to_process) // batch_size)  # ceil division
-            all_results = []
+    async def _verify_or_reprocess(self, prepared: PreparedFile) -> Optional[FailedFile]:
+        """Phase 2 for a hash-matched file: check its vectors are in the KB, re-embed if not."""
+        async with self._stage_gate(self._process_sem):
+            verify_result = await self._ensure_vectors_in_kb(prepared.file_id)
+        if not verify_result:
+            # Vectors verified, emit file added event
+            file_record = prepared.file_record or await Files.get_file_by_id(prepared.file_id)
+            if file_record:
+                await self._emit_file_added(file_record)
+            return None
+        if verify_result.error_type == SyncErrorType.EMPTY_CONTENT.value:
+            return None  # Skip, not failure
+        log.warning(f'File {prepared.file_id} vectors missing, re-processing')
+        return await self._process_and_embed(prepared)
 
-            for batch_start in range(0, len(all_files_to_process), batch_size):
-                batch_num = batch_start // batch_size + 1
-                batch = all_files_to_process[batch_start : batch_start + batch_size]
+    async def _pipeline_file(self, run: _LegacyRun, file_info: Dict[str, Any]) -> Optional[FailedFile]:
+        """Download + process one file, recording the outcome on ``run``."""
+        if run.cancelled or await self._check_cancelled():
+            run.cancelled = True
+            return _cancelled_failure(file_info.get('name', 'unknown'))
 
-                if cancelled or await self._check_cancelled():
-                    cancelled = True
-                    break
+        try:
+            # Phase 1: Download + store. Only the provider fetch inside
+            # _download_and_store holds self._download_sem; hashing and
+            # the DB/storage writes run outside it.
+            result = await self._download_and_store(file_info)
 
-                log.info(f'Batch {batch_num}/{total_batches}: processing {len(batch)} files (offset {batch_start})')
-                batch_t0 = time.time()
+            if isinstance(result, FailedFile):
+                self._record_result(run, file_info, ok=False)
+                return result
 
-                batch_tasks = [pipeline(file_info, batch_start + i) for i, file_info in enumerate(batch)]
-                batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-                all_results.extend(batch_results)
+            if result is None:
+                # Hash match — already handled, count as success
+                self._record_result(run, file_info, ok=True)
+                return None
 
-                log.info(
-                    f'Batch {batch_num}/{total_batches} done in {time.time() - batch_t0:.1f}s '
-                    f'(processed={processed_count}, failed={failed_count})'
-                )
+            # Phase 2: Process + embed. Extraction / vector checks hold
+            # self._process_sem and embedding holds self._embed_sem,
+            # acquired per stage so the two overlap across files.
+            if run.cancelled or await self._check_cancelled():
+                run.cancelled = True
+                return _cancelled_failure(file_info.get('name', 'unknown'))
 
-            for result in all_results:
-                if isinstance(result, Exception):
-                    log.error(f'Unexpected error during file processing: {result}')
-                    total_failed += 1
-                    failed_files.append(
-                        FailedFile(
-                            filename='unknown',
-                            error_type=SyncErrorType.PROCESSING_ERROR.value,
-                            error_message=str(result)[:100],
-                        )
-                    )
-                elif result is not None:
-                    failed_files.append(result)
+            if result.is_new:
+                process_result = await self._process_and_embed(result)
+            else:
+                process_result = await self._verify_or_reprocess(result)
 
-            total_processed = processed_count
-            total_failed = failed_count
+            self._record_result(run, file_info, ok=process_result is None)
+            return process_result
 
-            processing_time = time.time() - start_time
-            log.info(
-                f'Pipeline processing completed in {processing_time:.2f}s: '
-                f'{total_processed} succeeded, {total_failed} failed'
+        except Exception as e:
+            log.error(f'Error in pipeline for {file_info.get("name")}: {e}')
+            self._record_result(run, file_info, ok=False)
+            return FailedFile(
+                filename=file_info.get('name', 'unknown'),
+                error_type=SyncErrorType.PROCESSING_ERROR.value,
+                error_message=_short_err(e),
             )
 
-            # Check if cancelled during processing
-            if cancelled:
-                log.info(f'Sync cancelled by user for knowledge {self.knowledge_id}')
+    async def _run_pipeline_file(self, run: _LegacyRun, file_info: Dict[str, Any]) -> Optional[FailedFile]:
+        """``_pipeline_file`` with a per-file timeout to prevent indefinite hangs.
 
-                for source in self.sources:
-                    for key in self.source_clear_delta_keys:
-                        source.pop(key, None)
-                await self._save_sources()
+        Never raises (other than cancellation): a task error inside the
+        TaskGroup would cancel every sibling, so anything that slips past
+        ``_pipeline_file`` is turned into a FailedFile here.
+        """
+        try:
+            return await asyncio.wait_for(self._pipeline_file(run, file_info), timeout=FILE_PIPELINE_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.error(f'File {file_info.get("name")} timed out after {FILE_PIPELINE_TIMEOUT}s')
+            error_message = f'Timed out after {FILE_PIPELINE_TIMEOUT}s'
+        except Exception as e:
+            log.error(f'Unexpected error during file processing: {e}')
+            error_message = _short_err(e)
+        self._record_result(run, file_info, ok=False)
+        return FailedFile(
+            filename=file_info.get('name', 'unknown'),
+            error_type=SyncErrorType.PROCESSING_ERROR.value,
+            error_message=error_message,
+        )
 
-                await self._update_sync_status(
-                    'cancelled',
-                    current=total_processed + total_failed,
-                    total=total_files,
-                    error='Sync cancelled by user',
-                    files_processed=total_processed,
-                    files_failed=total_failed,
-                    deleted_count=total_deleted,
-                    files_unchanged=unchanged_count,
-                    files_removed=total_deleted,
-                    failed_files=failed_files,
-                )
-                return {
-                    'files_processed': total_processed,
-                    'files_failed': total_failed,
-                    'total_found': total_files,
-                    'deleted_count': total_deleted,
-                    'files_unchanged': unchanged_count,
-                    'files_removed': total_deleted,
-                    'cancelled': True,
-                    'failed_files': [asdict(f) for f in failed_files],
-                }
+    async def _admit_files(self, run: _LegacyRun, files: List[Dict[str, Any]], max_in_flight: int) -> None:
+        """Run ``files`` through the pipeline with at most ``max_in_flight`` tasks alive.
 
-            # Save updated sources
-            await self._save_sources()
+        Memory for pending work is O(concurrency) rather than O(files), and a
+        slow file doesn't hold back a whole batch; the per-stage semaphores
+        still bound each stage individually. Cancellation (in-process or
+        written by another worker) is checked before every admission.
+        """
+        admission = asyncio.Semaphore(max_in_flight)
+
+        def _on_done(index: int, task: asyncio.Task) -> None:
+            admission.release()
+            if not task.cancelled() and (result := task.result()) is not None:
+                run.failures[index] = result
+
+        async with asyncio.TaskGroup() as tg:
+            for index, file_info in enumerate(files):
+                await admission.acquire()
+                if run.cancelled or await self._check_cancelled():
+                    run.cancelled = True
+                    admission.release()
+                    break
+                task = tg.create_task(self._run_pipeline_file(run, file_info))
+                task.add_done_callback(functools.partial(_on_done, index))
+
+    async def _run_legacy_pipeline(
+        self, files: List[Dict[str, Any]], total_files: int, unchanged_count: int
+    ) -> _LegacyRun:
+        """Run ``files`` through the two-phase in-pod pipeline."""
+        max_in_flight = self._init_stage_gates(len(files))
+        run = _LegacyRun(total_files=total_files, processed=unchanged_count)
+        start_time = time.time()
+
+        publisher = asyncio.create_task(self._publish_progress(run))
+        self._event_queue = asyncio.Queue()
+        emitter = asyncio.create_task(self._drain_events(self._event_queue))
+        try:
+            await self._admit_files(run, files, max_in_flight)
+        finally:
+            # Send every queued file event before the final counters so
+            # the UI sees all files before the sync reports done.
+            self._event_queue.put_nowait(None)
+            self._event_queue = None
+            await emitter
+            # Flush the final counters, then let the publisher exit.
+            run.finished = True
+            run.progress_dirty.set()
+            await publisher
+
+        processing_time = time.time() - start_time
+        log.info(
+            f'Pipeline processing completed in {processing_time:.2f}s: {run.processed} succeeded, {run.failed} failed'
+        )
+        return run
+
+    async def _finish_legacy_sync(self, run: _LegacyRun, unchanged_count: int, total_deleted: int) -> Dict[str, Any]:
+        """Write the terminal status of a legacy-pipeline sync and build its result."""
+        total_processed = run.processed
+        total_failed = run.failed
+        total_files = run.total_files
+        failed_files = run.failed_files()
+        failed_files_dicts = [asdict(f) for f in failed_files]
 
-            failed_files_dicts = [asdict(f) for f in failed_files]
+        if run.cancelled:
+            log.info(f'Sync cancelled by user for knowledge {self.knowledge_id}')
 
-            # Update final sync status. The legacy in-pod path doesn't track
-            # per-file outcomes by classification bucket, so we approximate
-            # the new toast counts: items that ran through the pipeline are
-            # ``files_processed - unchanged_count``, and we attribute them
-            # all to ``files_added`` (the legacy path is dead-coded behind
-            # USE_SHARED_LOADER and doesn't need precise added/updated split).
-            legacy_added = max(0, total_processed - unchanged_count)
-            knowledge = await Knowledges.get_knowledge_by_id(self.knowledge_id)
-            meta = knowledge.meta or {}
-            sync_info = meta.get(self.meta_key, {})
-            sync_info['last_sync_at'] = int(time.time())
-            sync_info['status'] = 'completed' if total_failed == 0 else 'completed_with_errors'
-            sync_info['last_result'] = {
-                'files_processed': total_processed,
-                'files_failed': total_failed,
-                'total_found': total_files,
-                'deleted_count': total_deleted,
-                'files_added': legacy_added,
-                'files_updated': 0,
-                'files_unchanged': unchanged_count,
-                'files_removed': total_deleted,
-                'failed_files': failed_files_dicts,
-            }
-            meta[self.meta_key] = sync_info
-            await Knowledges.update_knowledge_meta_by_id(self.knowledge_id, meta)
+            for source in self.sources:
+                for key in self.source_clear_delta_keys:
+                    source.pop(key, None)
+            await self._save_sources()
 
             await self._update_sync_status(
-                sync_info['status'],
-                current=total_files,
+                'cancelled',
+                current=total_processed + total_failed,
                 total=total_files,
+                error='Sync cancelled by user',
                 files_processed=total_processed,
                 files_failed=total_failed,
                 deleted_count=total_deleted,
-                files_added=legacy_added,
-                files_updated=0,
                 files_unchanged=unchanged_count,
                 files_removed=total_deleted,
                 failed_files=failed_files,
             )
-
-            log.info(f'Sync completed for {self.knowledge_id}: {total_processed} processed, {total_failed} failed')
-
             return {
                 'files_processed': total_processed,
                 'files_failed': total_failed,
                 'total_found': total_files,
                 'deleted_count': total_deleted,
+                'files_unchanged': unchanged_count,
+                'files_removed': total_deleted,
+                'cancelled': True,
                 'failed_files': failed_files_dicts,
             }
 
+        # Update final sync status. The legacy in-pod path doesn't track
+        # per-file outcomes by classification bucket, so we approximate
+        # the new toast counts: items that ran through the pipeline are
+        # ``files_processed - unchanged_count``, and we attribute them
+        # all to ``files_added`` (the legacy path is dead-coded behind
+        # USE_SHARED_LOADER and doesn't need precise added/updated split).
+        legacy_added = max(0, total_processed - unchanged_count)
+        await self._update_sync_status(
+            'completed' if total_failed == 0 else 'completed_with_errors',
+            current=total_files,
+            total=total_files,
+            files_processed=total_processed,
+            files_failed=total_failed,
+            deleted_count=total_deleted,
+            files_added=legacy_added,
+            files_updated=0,
+            files_unchanged=unchanged_count,
+            files_removed=total_deleted,
+            failed_files=failed_files,
+            last_result={
+                'files_processed': total_processed,
+                'files_failed': total_failed,
+                'total_found': total_files,
+                'deleted_count': total_deleted,
+                'files_added': legacy_added,
+                'files_updated': 0,
+                'files_unchanged': unchanged_count,
+                'files_removed': total_deleted,
+                'failed_files': failed_files_dicts,
+            },
+            save_sources=True,
+        )
+
+        log.info(f'Sync completed for {self.knowledge_id}: {total_processed} processed, {total_failed} failed')
+
+        return {
+            'files_processed': total_processed,
+            'files_failed': total_failed,
+            'total_found': total_files,
+            'deleted_count': total_deleted,
+            'failed_files': failed_files_dicts,
+        }
+
+    async def sync(self) -> Dict[str, Any]:
+        """Execute sync operation for all sources."""
+        self._reset_run_state()
+        self._client = self._create_client()
+        self._cancel_event = asyncio.Event()
+        _RUNNING_SYNCS[self.knowledge_id] = self._cancel_event
+
+        try:
+            await self._update_sync_status('syncing', 0, 0)
+
+            # Verify the owner still has access; may suspend the KB
+            await self._sync_permissions()
+
+            # Check if KB was suspended by _sync_permissions()
+            if await self._is_suspended():
+                log.info(f'KB {self.knowledge_id} is suspended, skipping sync')
+                return {
+                    'files_processed': 0,
+                    'files_failed': 0,
+                    'total_found': 0,
+                    'deleted_count': 0,
+                    'failed_files': [],
+                    'suspended': True,
+                }
+
+            await self._drop_revoked_sources()
+
+            log.info(f'Starting multi-source sync for knowledge {self.knowledge_id}, {len(self.sources)} sources')
+
+            all_files_to_process, total_deleted = await self._collect_sources()
+
+            current_files = await self._get_kb_files()
+            limited_files = await self._apply_file_limit(all_files_to_process, len(current_files))
+            if limited_files is None:
+                await self._save_sources()
+                return {
+                    'files_processed': 0,
+                    'files_failed': 0,
+                    'total_found': len(all_files_to_process),
+                    'deleted_count': total_deleted,
+                    'failed_files': [],
+                    'file_limit_exceeded': True,
+                }
+
+            all_files_to_process, added_file_ids, updated_file_ids, unchanged_count = await self._classify_files(
+                limited_files, current_files
+            )
+            total_files = len(all_files_to_process) + unchanged_count
+
+            # Pre-create the KB collection so individual file inserts don't
+            # race to create it (avoids N-1 wasted 422 roundtrips).
+            await ASYNC_VECTOR_DB_CLIENT.insert(collection_name=self.knowledge_id, items=[])
+
+            # USE_SHARED_LOADER branch: delegate everything to the per-tenant
+            # loader-worker pod. The in-pod pipeline below is bypassed.
+            if self._use_shared_loader and self._pipeline_client:
+                return await self._sync_via_pipeline(
+                    all_files_to_process=all_files_to_process,
+                    total_files=total_files,
+                    added_file_ids=added_file_ids,
+                    updated_file_ids=updated_file_ids,
+                    unchanged_count=unchanged_count,
+                    total_deleted=total_deleted,
+                )
+
+            run = await self._run_legacy_pipeline(all_files_to_process, total_files, unchanged_count)
+            return await self._finish_legacy_sync(run, unchanged_count, total_deleted)
+
         except (ConnectionError, httpx.TransportError) as e:
             # Connectivity loss — DNS failure, connection refused, or timeout —
             # is transient and expected: the host may be offline or the
@@ -2434,4 +2912,8 @@ class BaseSyncWorker(ABC):
             raise
 
         finally:
+            if _RUNNING_SYNCS.get(self.knowledge_id) is self._cancel_event:
+                del _RUNNING_SYNCS[self.knowledge_id]
+            if self._pipeline_client:
+                await self._pipeline_client.close()
             await self._close_client()
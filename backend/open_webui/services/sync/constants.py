@@ -2,6 +2,8 @@
 
 from dataclasses import dataclass
 from enum import Enum
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 
 class SyncErrorType(str, Enum):
@@ -33,40 +35,40 @@ class FailedFile:
     error_message: str
 
 
-# Supported file extensions for processing
-SUPPORTED_EXTENSIONS = {
-    '.pdf',
-    '.doc',
-    '.docx',
-    '.xls',
-    '.xlsx',
-    '.ppt',
-    '.pptx',
-    '.txt',
-    '.md',
-    '.html',
-    '.htm',
-    '.json',
-    '.xml',
-    '.csv',
-    '.ifc',
-}
+# MIME types for supported extensions. The single source of truth for what
+# the sync providers ingest: an extension is supported iff it is a key here.
+CONTENT_TYPES: Mapping[str, str] = MappingProxyType(
+    {
+        '.pdf': 'application/pdf',
+        '.doc': 'application/msword',
+        '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        '.xls': 'application/vnd.ms-excel',
+        '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        '.ppt': 'application/vnd.ms-powerpoint',
+        '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+        '.txt': 'text/plain',
+        '.md': 'text/markdown',
+        '.html': 'text/html',
+        '.htm': 'text/html',
+        '.json': 'application/json',
+        '.xml': 'application/xml',
+        '.csv': 'text/csv',
+        '.ifc': 'application/x-ifc',
+    }
+)
 
-# MIME types for supported extensions
-CONTENT_TYPES = {
-    '.pdf': 'application/pdf',
-    '.doc': 'application/msword',
-    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-    '.xls': 'application/vnd.ms-excel',
-    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    '.ppt': 'application/vnd.ms-powerpoint',
-    '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
-    '.txt': 'text/plain',
-    '.md': 'text/markdown',
-    '.html': 'text/html',
-    '.htm': 'text/html',
-    '.json': 'application/json',
-    '.xml': 'application/xml',
-    '.csv': 'text/csv',
-    '.ifc': 'application/x-ifc',
-}
+# Kept for callers that only need membership (see the integration cookbook).
+SUPPORTED_EXTENSIONS: frozenset[str] = frozenset(CONTENT_TYPES)
+
+
+def content_type_for(name: str) -> Optional[str]:
+    """MIME type for a supported file name, or None if the extension isn't supported.
+
+    One lookup on the lower-cased extension (supported means "a key of
+    ``CONTENT_TYPES``"), so the per-item support filter and content-type
+    resolution share a single, allocation-free path.
+    """
+    i = name.rfind('.')
+    # i > 0: a leading dot (e.g. '.md') is a hidden name, not an extension —
+    # same as Path(name).suffix.
+    return CONTENT_TYPES.get(name[i:].lower()) if i > 0 else None
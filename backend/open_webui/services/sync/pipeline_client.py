@@ -25,8 +25,9 @@ class PipelineClient:
 
     Construction reads ``LOADER_WORKER_URL`` and ``TENANT_NAME`` from env once;
     callers are expected to instantiate per-worker (cheap — no network I/O on
-    init). Every request opens a fresh ``AsyncClient`` to keep connection-pool
-    lifetimes scoped to a single call.
+    init). The underlying ``AsyncClient`` is created on first use and reused
+    for the worker's lifetime, so submit + the status poll loop share one
+    keep-alive connection; the owner calls ``close()`` when the sync ends.
     """
 
     def __init__(
@@ -38,6 +39,17 @@ class PipelineClient:
         self._base = (base_url if base_url is not None else os.environ.get('LOADER_WORKER_URL', '')).rstrip('/')
         self._tenant = tenant if tenant is not None else os.environ.get('TENANT_NAME', '')
         self._timeout = timeout or httpx.Timeout(connect=5.0, read=30.0, write=30.0, pool=30.0)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self._timeout)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client:
+            await self._client.aclose()
+            self._client = None
 
     async def submit_job(
         self,
@@ -67,28 +79,28 @@ class PipelineClient:
             'items': items,
         }
 
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            resp = await client.post(
-                f'{self._base}/tenants/{self._tenant}/jobs',
-                json=payload,
-            )
-            resp.raise_for_status()
-            return resp.json()['job_id']
+        client = await self._get_client()
+        resp = await client.post(
+            f'{self._base}/tenants/{self._tenant}/jobs',
+            json=payload,
+        )
+        resp.raise_for_status()
+        return resp.json()['job_id']
 
     async def get_status(self, job_id: str) -> Dict[str, Any]:
         if not self._base:
             raise RuntimeError('PipelineClient requires LOADER_WORKER_URL env var')
 
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            resp = await client.get(f'{self._base}/jobs/{job_id}')
-            resp.raise_for_status()
-            return resp.json()
+        client = await self._get_client()
+        resp = await client.get(f'{self._base}/jobs/{job_id}')
+        resp.raise_for_status()
+        return resp.json()
 
     async def cancel_job(self, job_id: str) -> Dict[str, Any]:
         if not self._base:
             raise RuntimeError('PipelineClient requires LOADER_WORKER_URL env var')
 
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            resp = await client.post(f'{self._base}/jobs/{job_id}/cancel')
-            resp.raise_for_status()
-            return resp.json()
+        client = await self._get_client()
+        resp = await client.post(f'{self._base}/jobs/{job_id}/cancel')
+        resp.raise_for_status()
+        return resp.json()
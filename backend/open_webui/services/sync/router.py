@@ -15,6 +15,7 @@ from pydantic import BaseModel
 
 from open_webui.models.knowledge import Knowledges
 from open_webui.models.users import UserModel
+from open_webui.services.sync.base_worker import request_cancel
 
 log = logging.getLogger(__name__)
 
@@ -188,6 +189,8 @@ async def handle_cancel_sync(
     sync_info['status'] = 'cancelled'
     meta[meta_key] = sync_info
     await Knowledges.update_knowledge_meta_by_id(knowledge_id, meta)
+    # Wake a sync running in this process now instead of at its next meta poll.
+    request_cancel(knowledge_id)
 
     log.info(f'Sync cancelled for knowledge base {knowledge_id}')
     return {'message': 'Sync cancelled', 'knowledge_id': knowledge_id}
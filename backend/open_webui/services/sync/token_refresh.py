@@ -4,9 +4,10 @@ Provides the shared token lifecycle flow (check expiry, refresh, mark needs_reau
 Each provider supplies its own _refresh_token() implementation for the actual HTTP call.
 """
 
+import asyncio
 import time
 import logging
-from typing import Optional, Callable, Awaitable
+from typing import Optional, Callable, Awaitable, Dict, Tuple
 
 from open_webui.models.oauth_sessions import OAuthSessions
 from open_webui.services.sync.events import emit_sync_progress
@@ -15,6 +16,11 @@ log = logging.getLogger(__name__)
 
 _REFRESH_BUFFER_SECONDS = 300  # 5 minutes
 
+# Refreshes in flight, keyed by (provider, user_id) — OAuth sessions are per
+# user. Providers rotate refresh tokens, so concurrent refreshes would
+# invalidate each other; later callers await the first one instead.
+_INFLIGHT_REFRESHES: Dict[Tuple[str, str], 'asyncio.Task[Optional[str]]'] = {}
+
 # Maps provider_type → Socket.IO event prefix used by the frontend
 # listeners ({prefix}:sync:progress). Mirrors the per-provider sync_events.py
 # _PREFIX constants — kept here so token_refresh can emit a terminal progress
@@ -48,16 +54,48 @@ async def get_valid_access_token(
     if not session:
         return None
 
-    token_data = session.token
-    expires_at = token_data.get('expires_at', 0)
-
     # Check if token needs refresh
-    if time.time() + _REFRESH_BUFFER_SECONDS < expires_at:
-        return token_data.get('access_token')
+    if _is_fresh(session.token):
+        return session.token.get('access_token')
+
+    # Token expired or near-expiry — refresh (single-flight per user)
+    key = (provider, user_id)
+    task = _INFLIGHT_REFRESHES.get(key)
+    if task is None:
+        task = asyncio.create_task(_refresh_session(provider, meta_key, user_id, knowledge_id, refresh_fn))
+        _INFLIGHT_REFRESHES[key] = task
+        task.add_done_callback(lambda _: _INFLIGHT_REFRESHES.pop(key, None))
+    # Shielded so one cancelled caller doesn't abort the refresh for the rest.
+    return await asyncio.shield(task)
+
+
+def _is_fresh(token_data: dict) -> bool:
+    """True if the access token is valid for longer than the refresh buffer."""
+    return time.time() + _REFRESH_BUFFER_SECONDS < token_data.get('expires_at', 0)
+
+
+async def _refresh_session(
+    provider: str,
+    meta_key: str,
+    user_id: str,
+    knowledge_id: str,
+    refresh_fn: Callable[[dict], Awaitable[Optional[dict]]],
+) -> Optional[str]:
+    """Refresh the user's stored token and persist it. Returns the new access token.
+
+    The session is re-read here rather than taken from the caller: a caller
+    that loaded it just before an earlier refresh finished holds a refresh
+    token that has since been rotated. If the stored token is already fresh,
+    it is returned without refreshing again.
+    """
+    session = await OAuthSessions.get_session_by_provider_and_user_id(provider, user_id)
+    if not session:
+        return None
+    if _is_fresh(session.token):
+        return session.token.get('access_token')
 
-    # Token expired or near-expiry — refresh
     log.info('Refreshing token for user %s, KB %s', user_id, knowledge_id)
-    new_token_data = await refresh_fn(token_data)
+    new_token_data = await refresh_fn(session.token)
 
     if new_token_data is None:
         # Refresh failed — token likely revoked
@@ -83,6 +121,7 @@ async def _mark_needs_reauth(provider_type: str, meta_key: str, user_id: str):
     user watching the knowledge list sees the warning appear without a reload.
     """
     from open_webui.models.knowledge import Knowledges
+    from open_webui.services.sync.base_worker import request_cancel
 
     event_prefix = _PROVIDER_EVENT_PREFIXES.get(provider_type)
     kbs = await Knowledges.get_knowledge_bases_by_type(provider_type)
@@ -101,6 +140,8 @@ async def _mark_needs_reauth(provider_type: str, meta_key: str, user_id: str):
 
         meta[meta_key] = sync_info
         await Knowledges.update_knowledge_meta_by_id(kb.id, meta)
+        if was_syncing:
+            request_cancel(kb.id)
 
         if was_syncing and event_prefix:
             try:
@@ -37,6 +37,9 @@ from azure.core.exceptions import ResourceNotFoundError
 
 log = logging.getLogger(__name__)
 
+# Copy buffer for ``upload_stream`` (a multiple of 256 KiB).
+STREAM_CHUNK_SIZE = 1024 * 1024
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -47,6 +50,13 @@ class StorageProvider(ABC):
     def upload_file(self, file: BinaryIO, filename: str, tags: Dict[str, str]) -> Tuple[bytes, str]:
         pass
 
+    def upload_stream(self, file: BinaryIO, filename: str, tags: Dict[str, str]) -> Tuple[int, str]:
+        """Upload from a file object without holding it in memory. Returns (size, path).
+
+        Default implementation falls back to ``upload_file``."""
+        contents, file_path = self.upload_file(file, filename, tags)
+        return len(contents), file_path
+
     @abstractmethod
     def delete_all_files(self) -> None:
         pass
@@ -79,6 +89,18 @@ class LocalStorageProvider(StorageProvider):
             f.write(contents)
         return contents, file_path
 
+    @staticmethod
+    def upload_stream(file: BinaryIO, filename: str, tags: Dict[str, str]) -> Tuple[int, str]:
+        """Copies the file object to local storage in chunks."""
+        file_path = os.path.join(UPLOAD_DIR, filename)
+        with open(file_path, 'wb') as f:
+            shutil.copyfileobj(file, f, STREAM_CHUNK_SIZE)
+            size = f.tell()
+        if not size:
+            os.remove(file_path)
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        return size, file_path
+
     @staticmethod
     def get_file(file_path: str) -> str:
         """Handles downloading of the file from local storage."""
@@ -156,6 +178,14 @@ class S3StorageProvider(StorageProvider):
     def upload_file(self, file: BinaryIO, filename: str, tags: Dict[str, str]) -> Tuple[bytes, str]:
         """Handles uploading of the file to S3 storage."""
         contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        return contents, self._upload_local_file(file_path, filename, tags)
+
+    def upload_stream(self, file: BinaryIO, filename: str, tags: Dict[str, str]) -> Tuple[int, str]:
+        """Streams the file to local storage, then to S3 (multipart for large files)."""
+        size, file_path = LocalStorageProvider.upload_stream(file, filename, tags)
+        return size, self._upload_local_file(file_path, filename, tags)
+
+    def _upload_local_file(self, file_path: str, filename: str, tags: Dict[str, str]) -> str:
         s3_key = os.path.join(self.key_prefix, filename)
         try:
             self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
@@ -167,10 +197,7 @@ class S3StorageProvider(StorageProvider):
                     Key=s3_key,
                     Tagging=tagging,
                 )
-            return (
-                contents,
-                f's3://{self.bucket_name}/{s3_key}',
-            )
+            return f's3://{self.bucket_name}/{s3_key}'
         except ClientError as e:
             raise RuntimeError(f'Error uploading file to S3: {e}')
 
@@ -276,6 +303,16 @@ class GCSStorageProvider(StorageProvider):
         except GoogleCloudError as e:
             raise RuntimeError(f'Error uploading file to GCS: {e}')
 
+    def upload_stream(self, file: BinaryIO, filename: str, tags: Dict[str, str]) -> Tuple[int, str]:
+        """Streams the file to local storage, then uploads it to GCS from disk."""
+        size, file_path = LocalStorageProvider.upload_stream(file, filename, tags)
+        try:
+            blob = self.bucket.blob(filename)
+            blob.upload_from_filename(file_path)
+            return size, 'gs://' + self.bucket_name + '/' + filename
+        except GoogleCloudError as e:
+            raise RuntimeError(f'Error uploading file to GCS: {e}')
+
     def get_file(self, file_path: str) -> str:
         """Handles downloading of the file from GCS storage."""
         try:
@@ -366,6 +403,17 @@ class AzureStorageProvider(StorageProvider):
         except Exception as e:
             raise RuntimeError(f'Error uploading file to Azure Blob Storage: {e}')
 
+    def upload_stream(self, file: BinaryIO, filename: str, tags: Dict[str, str]) -> Tuple[int, str]:
+        """Streams the file to local storage, then uploads it to Azure in chunks from disk."""
+        size, file_path = LocalStorageProvider.upload_stream(file, filename, tags)
+        try:
+            blob_client = self.container_client.get_blob_client(filename)
+            with open(file_path, 'rb') as f:
+                blob_client.upload_blob(f, length=size, overwrite=True)
+            return size, f'{self.endpoint}/{self.container_name}/{filename}'
+        except Exception as e:
+            raise RuntimeError(f'Error uploading file to Azure Blob Storage: {e}')
+
     def get_file(self, file_path: str) -> str:
         """Handles downloading of the file from Azure Blob Storage."""
         try:
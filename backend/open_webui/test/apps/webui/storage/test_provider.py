@@ -74,6 +74,16 @@ class TestLocalStorageProvider:
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
 
+    def test_upload_stream(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        size, file_path = self.Storage.upload_stream(io.BytesIO(self.file_content), self.filename, {})
+        assert size == len(self.file_content)
+        assert file_path == str(upload_dir / self.filename)
+        assert (upload_dir / self.filename).read_bytes() == self.file_content
+        with pytest.raises(ValueError):
+            self.Storage.upload_stream(io.BytesIO(), self.filename, {})
+        assert not (upload_dir / self.filename).exists()
+
     def test_get_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         file_path = str(upload_dir / self.filename)
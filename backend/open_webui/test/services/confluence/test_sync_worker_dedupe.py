@@ -0,0 +1,72 @@
+"""Cross-source page dedupe in ConfluenceSyncWorker.
+
+Sources are collected concurrently, so a single-page source and a space
+listing the same page can interleave. The page source claims its
+``_seen_page_ids`` key before fetching the page; a space listing that
+finishes during the fetch must skip the page, and the page is queued once.
+A failed fetch releases the key. These tests run without pytest-asyncio
+via asyncio.run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from open_webui.services.confluence.sync_worker import ConfluenceSyncWorker
+
+
+class _SlowPageClient:
+    """get_page is slower than the space listing, so the two overlap."""
+
+    def __init__(self, page: dict | None = None, error: Exception | None = None):
+        self._page = page
+        self._error = error
+
+    async def get_page(self, page_id: str, include_body: bool = False) -> dict | None:
+        await asyncio.sleep(0.02)
+        if self._error is not None:
+            raise self._error
+        return self._page
+
+
+def _make_worker(client: _SlowPageClient, sources: list) -> ConfluenceSyncWorker:
+    worker = ConfluenceSyncWorker.__new__(ConfluenceSyncWorker)
+    worker._reset_run_state()
+    worker.knowledge_id = 'kb-test'
+    worker.user_id = 'user-test'
+    worker.sources = sources
+    worker._use_shared_loader = False
+    worker._seen_page_ids = set()
+    worker._client_for = lambda cloud_id: client
+
+    async def _list_pages(source, client):
+        return [{'id': 'p1', 'title': 'Shared', 'version': {'number': 3}}]
+
+    worker._list_pages_for_source = _list_pages
+    return worker
+
+
+def _sources() -> list:
+    space = {'type': 'folder', 'confluence_type': 'space', 'cloud_id': 'c1', 'item_id': 'space-1'}
+    page = {'type': 'file', 'confluence_type': 'page', 'cloud_id': 'c1', 'item_id': 'p1', 'name': 'Shared'}
+    return [page, space]
+
+
+def test_overlapping_page_and_space_queue_the_page_once():
+    client = _SlowPageClient(page={'id': 'p1', 'title': 'Shared', 'version': {'number': 3}})
+    worker = _make_worker(client, _sources())
+
+    files, deleted = asyncio.run(worker._collect_sources())
+
+    assert [f['page_id'] for f in files] == ['p1']
+    assert deleted == 0
+
+
+def test_failed_page_fetch_releases_the_claim():
+    client = _SlowPageClient(error=RuntimeError('boom'))
+    worker = _make_worker(client, _sources()[:1])
+
+    files, _ = asyncio.run(worker._collect_sources())
+
+    assert files == []
+    assert worker._seen_page_ids == set()
@@ -0,0 +1,115 @@
+"""Guards `GraphClient.stream_file`'s redirect handling and throttling retry,
+`batch_get`'s chunking into $batch calls and retry of throttled sub-requests,
+and Retry-After parsing."""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+from email.utils import format_datetime
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from open_webui.services.onedrive.graph_client import GraphClient, _retry_after_seconds
+
+DOWNLOAD_URL = 'https://download.example/blob?sig=abc'
+
+
+def _client(handler) -> GraphClient:
+    client = GraphClient('token')
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+async def _collect(client: GraphClient) -> bytes:
+    return b''.join([chunk async for chunk in client.stream_file('d1', 'i1')])
+
+
+@pytest.mark.asyncio
+async def test_stream_follows_redirect_and_retries_throttled_download():
+    download_statuses = iter([503, 200])
+    seen_auth = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == 'graph.microsoft.com':
+            return httpx.Response(302, headers={'Location': DOWNLOAD_URL})
+        seen_auth.append(request.headers.get('Authorization'))
+        return httpx.Response(next(download_statuses), content=b'payload')
+
+    with patch('open_webui.services.onedrive.graph_client.asyncio.sleep', new=AsyncMock()) as sleep:
+        assert await _collect(_client(handler)) == b'payload'
+
+    sleep.assert_awaited_once_with(1)
+    # The pre-authenticated URL must not receive the bearer token.
+    assert seen_auth == [None, None]
+
+
+@pytest.mark.asyncio
+async def test_stream_without_redirect_yields_body():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=b'inline')
+
+    assert await _collect(_client(handler)) == b'inline'
+
+
+@pytest.mark.asyncio
+async def test_batch_get_chunks_requests_and_keeps_order():
+    batches = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == '/v1.0/$batch'
+        sub_requests = json.loads(request.content)['requests']
+        batches.append(len(sub_requests))
+        # Answer out of order; results must still line up with the input.
+        responses = [
+            {'id': r['id'], 'status': 404 if r['url'].endswith('/i3') else 200, 'body': {'url': r['url']}}
+            for r in reversed(sub_requests)
+        ]
+        return httpx.Response(200, json={'responses': responses})
+
+    paths = [f'/drives/d/items/i{n}' for n in range(25)]
+    results = await _client(handler).batch_get(paths)
+
+    assert batches == [20, 5]
+    assert [body['url'] for _, body in results] == paths
+    assert results[3][0] == 404
+    assert all(status == 200 for n, (status, _) in enumerate(results) if n != 3)
+
+
+@pytest.mark.asyncio
+async def test_batch_get_resubmits_only_throttled_sub_requests():
+    submitted = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sub_requests = json.loads(request.content)['requests']
+        submitted.append([r['url'] for r in sub_requests])
+        first_round = len(submitted) == 1
+        responses = [
+            {'id': r['id'], 'status': 429, 'headers': {'Retry-After': '7'}}
+            if first_round and r['url'].endswith('/i1')
+            else {'id': r['id'], 'status': 200, 'body': {'url': r['url']}}
+            for r in sub_requests
+        ]
+        return httpx.Response(200, json={'responses': responses})
+
+    paths = ['/drives/d/items/i0', '/drives/d/items/i1', '/drives/d/items/i2']
+    with (
+        patch('open_webui.services.onedrive.graph_client.asyncio.sleep', new=AsyncMock()) as sleep,
+        patch('open_webui.services.onedrive.graph_client.random.uniform', return_value=0),
+    ):
+        results = await _client(handler).batch_get(paths)
+
+    assert submitted == [paths, ['/drives/d/items/i1']]
+    sleep.assert_awaited_once_with(7)
+    assert [status for status, _ in results] == [200, 200, 200]
+    assert [body['url'] for _, body in results] == paths
+
+
+def test_retry_after_accepts_seconds_and_http_date():
+    assert _retry_after_seconds({'retry-after': '12'}, 60) == 12
+    assert _retry_after_seconds({}, 60) == 60
+    assert _retry_after_seconds({'Retry-After': 'soon'}, 60) == 60
+    retry_at = format_datetime(dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=30), usegmt=True)
+    assert 25 < _retry_after_seconds({'Retry-After': retry_at}, 60) <= 30
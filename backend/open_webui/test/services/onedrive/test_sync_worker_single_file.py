@@ -4,12 +4,15 @@ The OneDrive cloud picker hands the worker a single driveItem; until this
 fix the worker would queue *any* item the user picked, including unsupported
 types like .png. The folder-walk path filtered them via _is_supported_file;
 the single-file path now mirrors that behaviour.
+
+Also covers the eTag / content-hash checks that decide whether a picked file
+needs re-syncing.
 """
 
 from __future__ import annotations
 
 from types import SimpleNamespace
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
@@ -70,3 +73,89 @@ async def test_collect_single_file_supported_returns_dict():
     assert result['source_item_id'] == 'item-2'
     assert result['drive_id'] == 'drive-1'
     assert result['item'] == item
+
+
+@pytest.mark.asyncio
+async def test_collect_single_file_etag_not_modified_skips():
+    worker = _make_worker()
+    worker._client.get_item_if_modified = AsyncMock(return_value=(False, None))
+    worker._client.get_item = AsyncMock()
+
+    source = {
+        'drive_id': 'drive-1',
+        'item_id': 'item-3',
+        'name': 'report.docx',
+        'content_hash': 'abc123',
+        'etag': '"etag-1"',
+    }
+    existing = SimpleNamespace(data={'status': 'completed'})
+    with patch(
+        'open_webui.services.onedrive.sync_worker.Files.get_file_by_id',
+        new=AsyncMock(return_value=existing),
+    ):
+        result = await worker._collect_single_file(source)
+
+    assert result is None
+    worker._client.get_item_if_modified.assert_awaited_once_with('drive-1', 'item-3', '"etag-1"')
+    worker._client.get_item.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_collect_single_file_etag_not_modified_but_not_ingested_refetches():
+    worker = _make_worker()
+    item = {
+        'id': 'item-5',
+        'name': 'report.docx',
+        'size': 1024,
+        'eTag': '"etag-1"',
+        'file': {'hashes': {'sha256Hash': 'abc123'}},
+    }
+    worker._client.get_item_if_modified = AsyncMock(return_value=(False, None))
+    worker._client.get_item = AsyncMock(return_value=item)
+
+    source = {
+        'drive_id': 'drive-1',
+        'item_id': 'item-5',
+        'name': 'report.docx',
+        'content_hash': 'abc123',
+        'etag': '"etag-1"',
+    }
+    with patch(
+        'open_webui.services.onedrive.sync_worker.Files.get_file_by_id',
+        new=AsyncMock(return_value=SimpleNamespace(data={'status': 'error'})),
+    ) as get_file:
+        result = await worker._collect_single_file(source)
+
+    assert result is not None and result['item'] == item
+    worker._client.get_item.assert_awaited_once_with('drive-1', 'item-5')
+    # Both the eTag and hash-match paths look up the same prefixed record.
+    assert {c.args[0] for c in get_file.await_args_list} == {'onedrive-item-5'}
+
+
+@pytest.mark.asyncio
+async def test_collect_single_file_records_etag():
+    worker = _make_worker()
+    item = {
+        'id': 'item-4',
+        'name': 'report.docx',
+        'size': 1024,
+        'eTag': '"etag-2"',
+        'file': {'hashes': {'sha256Hash': 'def456'}},
+    }
+    worker._client.get_item = AsyncMock(return_value=item)
+
+    source = {'drive_id': 'drive-1', 'item_id': 'item-4', 'name': 'report.docx'}
+    result = await worker._collect_single_file(source)
+
+    assert result is not None
+    assert source['content_hash'] == 'def456'
+    assert source['etag'] == '"etag-2"'
+
+
+def test_cloud_hash_falls_back_to_ctag_without_hashes():
+    worker = _make_worker()
+    with_hash = {'file': {'hashes': {'quickXorHash': 'qx'}}, 'cTag': 'ctag-1'}
+    without_hash = {'file': {'mimeType': 'application/pdf'}, 'cTag': 'ctag-2'}
+
+    assert worker._get_cloud_hash({'item': with_hash}) == 'qx'
+    assert worker._get_cloud_hash({'item': without_hash}) == 'ctag-2'
@@ -65,6 +65,7 @@ class _StubWorker(BaseSyncWorker):
 
 def _make_worker():
     worker = _StubWorker.__new__(_StubWorker)
+    worker._reset_run_state()
     worker.knowledge_id = 'kb-test'
     worker.user_id = 'user-test'
     return worker
@@ -137,3 +138,48 @@ async def test_classify_no_cloud_hash_treated_as_updated():
     ):
         cat, _ = await worker._classify_for_submit(_file_info(cloud_hash=None))
     assert cat == 'updated'
+
+
+@pytest.mark.asyncio
+async def test_classify_uses_prefetched_rows_without_query():
+    worker = _make_worker()
+    existing = SimpleNamespace(meta={'cloud_hash': 'h1'}, data={'status': 'completed'})
+    get_one = AsyncMock(return_value=None)
+    with patch('open_webui.services.sync.base_worker.Files.get_file_by_id', new=get_one):
+        cat, _ = await worker._classify_for_submit(
+            _file_info(cloud_hash='h1'),
+            prefetched={'stub-item-1': existing},
+        )
+        added, _ = await worker._classify_for_submit(_file_info(item_id='item-2'), prefetched={})
+    assert cat == 'unchanged'
+    assert added == 'added'
+    get_one.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_classify_unchanged_row_not_in_kb_is_updated():
+    """A matching row linked only to another KB still needs linking here."""
+    worker = _make_worker()
+    existing = SimpleNamespace(meta={'cloud_hash': 'h1'}, data={'status': 'completed'})
+    cat, _ = await worker._classify_for_submit(
+        _file_info(cloud_hash='h1'),
+        prefetched={'stub-item-1': existing},
+        kb_file_ids={'stub-other'},
+    )
+    assert cat == 'updated'
+
+
+@pytest.mark.asyncio
+async def test_prefetch_reuses_known_rows_and_chunks_the_rest():
+    worker = _make_worker()
+    known = {'stub-a': SimpleNamespace(id='stub-a')}
+    ids = ['stub-a'] + [f'stub-{i}' for i in range(3)]
+    get_many = AsyncMock(side_effect=lambda chunk: [SimpleNamespace(id=fid) for fid in chunk])
+    with (
+        patch('open_webui.services.sync.base_worker.PREFETCH_CHUNK_SIZE', 2),
+        patch('open_webui.services.sync.base_worker.Files.get_files_by_ids', new=get_many),
+    ):
+        rows = await worker._prefetch_existing_files(ids, known=known)
+    assert set(rows) == set(ids)
+    assert rows['stub-a'] is known['stub-a']
+    assert [c.args[0] for c in get_many.await_args_list] == [['stub-0', 'stub-1'], ['stub-2']]
@@ -70,6 +70,7 @@ class _StubWorker(BaseSyncWorker):
 
 def _make_worker():
     worker = _StubWorker.__new__(_StubWorker)
+    worker._reset_run_state()
     worker.knowledge_id = 'kb-test'
     worker.user_id = 'user-test'
     worker.sources = []
@@ -172,3 +173,50 @@ async def test_counter_math_intersects_ok_ids_with_classification(
     assert result['files_unchanged'] == unchanged_count
     # Invariant: files_processed = files_added + files_updated, never includes unchanged
     assert result['files_processed'] == expect_added + expect_updated
+
+
+@pytest.mark.asyncio
+async def test_failed_and_orphan_items_resolved_with_one_bulk_lookup():
+    worker = _make_worker()
+    worker._fail_mark_outstanding_stubs = AsyncMock(return_value=0)
+    worker._track_job_progress = AsyncMock(
+        return_value={
+            'status': 'partial',
+            'items_completed': 0,
+            'items_failed': 1,
+            'items': [
+                {'file_id': 'stub-bad', 'stage': 'failed'},
+                {'file_id': 'stub-stuck', 'stage': 'parsing'},
+            ],
+            'errors': [{'file_id': 'stub-bad', 'error_code': 'empty_extraction'}],
+            'stage_counts': {},
+        }
+    )
+    rows = [
+        SimpleNamespace(id='stub-bad', filename='bad.docx', data={'status': 'error'}),
+        SimpleNamespace(id='stub-stuck', filename='stuck.docx', data={'status': 'pending'}),
+    ]
+    fake_kb = SimpleNamespace(meta={'stub_sync': {}})
+
+    with (
+        patch('open_webui.services.sync.base_worker.Files.get_files_by_ids', new=AsyncMock(return_value=rows)),
+        patch('open_webui.services.sync.base_worker.Files.get_file_by_id', new_callable=AsyncMock) as get_one,
+        patch(
+            'open_webui.services.sync.base_worker.Files.update_file_data_by_id', new_callable=AsyncMock
+        ) as update_data,
+        patch('open_webui.services.sync.base_worker.Knowledges.get_knowledge_by_id', return_value=fake_kb),
+        patch('open_webui.services.sync.base_worker.Knowledges.update_knowledge_meta_by_id'),
+    ):
+        result = await worker._sync_via_pipeline(
+            all_files_to_process=[_file_info('bad'), _file_info('stuck')],
+            total_files=2,
+            added_file_ids={'stub-bad', 'stub-stuck'},
+            updated_file_ids=set(),
+            unchanged_count=0,
+            total_deleted=0,
+        )
+
+    get_one.assert_not_awaited()
+    assert [f['filename'] for f in result['failed_files']] == ['bad.docx']
+    update_data.assert_awaited_once()
+    assert update_data.await_args.args[0] == 'stub-stuck'
@@ -0,0 +1,102 @@
+"""Guards the legacy download path's chunked spooling.
+
+Downloads used to be buffered as one ``bytes`` per file before the hash and
+storage upload. They now stream into a spooled temp file, hashed as chunks
+arrive, so large files spill to disk instead of staying resident.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from unittest.mock import patch
+
+import pytest
+
+from open_webui.services.sync import base_worker
+from open_webui.services.sync.base_worker import BaseSyncWorker
+
+
+class _StubWorker(BaseSyncWorker):
+    meta_key = 'stub_sync'
+    file_id_prefix = 'stub-'
+    event_prefix = 'stub'
+    provider_slug = 'stub'
+    internal_request_path = '/internal/stub-sync'
+    max_files_config = 100
+    source_clear_delta_keys: list[str] = []
+
+    def _create_client(self):
+        return None
+
+    async def _close_client(self):
+        return None
+
+    def _is_supported_file(self, item):
+        return True
+
+    async def _collect_folder_files(self, source):
+        return [], 0
+
+    async def _collect_single_file(self, source):
+        return None
+
+    async def _download_file_content(self, file_info):
+        return b'single-chunk'
+
+    def _get_provider_storage_headers(self, item_id):
+        return {}
+
+    def _get_provider_file_meta(self, **kwargs):
+        return {}
+
+    async def _sync_permissions(self):
+        return None
+
+    def _get_cloud_hash(self, file_info):
+        return file_info.get('cloud_hash')
+
+    async def _verify_source_access(self, source):
+        return True
+
+    async def _handle_revoked_source(self, source):
+        return 0
+
+
+def _make_worker():
+    worker = _StubWorker.__new__(_StubWorker)
+    worker._reset_run_state()
+    worker.knowledge_id = 'kb-test'
+    worker.user_id = 'user-test'
+    return worker
+
+
+class _ChunkedWorker(_StubWorker):
+    async def _iter_file_content(self, file_info):
+        for chunk in (b'abc', b'def', b'ghi'):
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_default_iter_yields_download_content():
+    worker = _make_worker()
+
+    spool, digest, size = await worker._download_to_spool({})
+
+    with spool:
+        assert spool.read() == b'single-chunk'
+    assert size == len(b'single-chunk')
+    assert digest == hashlib.sha256(b'single-chunk').hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_hashed_and_spilled_to_disk():
+    worker = _ChunkedWorker.__new__(_ChunkedWorker)
+
+    with patch.object(base_worker, 'DOWNLOAD_SPOOL_MAX_BYTES', 4):
+        spool, digest, size = await worker._download_to_spool({})
+
+    with spool:
+        assert spool._rolled
+        assert spool.read() == b'abcdefghi'
+    assert size == 9
+    assert digest == hashlib.sha256(b'abcdefghi').hexdigest()
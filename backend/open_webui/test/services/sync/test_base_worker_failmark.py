@@ -11,12 +11,14 @@ Cases covered:
 - stub in completed → unchanged (/ingest's terminal write wins)
 - stub in error → unchanged (already terminal)
 - missing _current_job_stub_file_ids → no-op
+- stub creation inserts only missing rows and links the KB in one batch
+- a failed batch insert or KB link falls back to per-row writes
 """
 
 from __future__ import annotations
 
 from types import SimpleNamespace
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
@@ -78,6 +80,7 @@ class _StubWorker(BaseSyncWorker):
 def _make_worker():
     """Build a worker without invoking BaseSyncWorker.__init__ (DB-free)."""
     worker = _StubWorker.__new__(_StubWorker)
+    worker._reset_run_state()
     worker.knowledge_id = 'kb-test'
     worker.user_id = 'user-test'
     return worker
@@ -197,3 +200,80 @@ async def test_fail_mark_uses_custom_error_status_for_cancellation():
 
     assert changed == 1
     assert updates[0][1]['status'] == 'cancelled'
+
+
+@pytest.mark.asyncio
+async def test_create_stub_rows_inserts_new_and_links_in_one_batch():
+    worker = _make_worker()
+    worker._prefetched_files = {'stub-old': SimpleNamespace(id='stub-old')}
+    files = [
+        {'item': {'id': 'old', 'size': 1}, 'name': 'old.docx'},
+        {'item': {'id': 'new', 'size': '2'}, 'name': 'new.docx'},
+    ]
+    with (
+        patch(
+            'open_webui.services.sync.base_worker.Files.insert_new_files', new_callable=AsyncMock, return_value=1
+        ) as insert,
+        patch('open_webui.services.sync.base_worker.Files.insert_new_file', new_callable=AsyncMock) as insert_one,
+        patch(
+            'open_webui.services.sync.base_worker.Knowledges.add_files_to_knowledge_by_ids',
+            new_callable=AsyncMock,
+        ) as link,
+        patch('open_webui.services.sync.base_worker.emit_file_processing', new_callable=AsyncMock) as emit,
+    ):
+        touched = await worker._create_stub_file_rows(files)
+
+    assert touched == ['stub-old', 'stub-new']
+    insert.assert_awaited_once()
+    assert [f.id for f in insert.await_args.args[1]] == ['stub-new']
+    insert_one.assert_not_awaited()
+    link.assert_awaited_once_with('kb-test', ['stub-old', 'stub-new'], 'user-test')
+    assert emit.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_create_stub_rows_falls_back_to_single_inserts():
+    worker = _make_worker()
+    worker._prefetched_files = {}
+    files = [
+        {'item': {'id': 'a', 'size': 1}, 'name': 'a.docx'},
+        {'item': {'id': 'b', 'size': 1}, 'name': 'b.docx'},
+    ]
+    with (
+        patch('open_webui.services.sync.base_worker.Files.insert_new_files', new_callable=AsyncMock, return_value=0),
+        patch('open_webui.services.sync.base_worker.Files.insert_new_file', new_callable=AsyncMock) as insert_one,
+        patch(
+            'open_webui.services.sync.base_worker.Knowledges.add_files_to_knowledge_by_ids',
+            new_callable=AsyncMock,
+        ),
+        patch('open_webui.services.sync.base_worker.emit_file_processing', new_callable=AsyncMock),
+    ):
+        touched = await worker._create_stub_file_rows(files)
+
+    assert touched == ['stub-a', 'stub-b']
+    assert [c.args[1].id for c in insert_one.await_args_list] == ['stub-a', 'stub-b']
+
+
+@pytest.mark.asyncio
+async def test_create_stub_rows_falls_back_to_single_links():
+    worker = _make_worker()
+    worker._prefetched_files = {'stub-a': SimpleNamespace(id='stub-a'), 'stub-b': SimpleNamespace(id='stub-b')}
+    files = [
+        {'item': {'id': 'a', 'size': 1}, 'name': 'a.docx'},
+        {'item': {'id': 'b', 'size': 1}, 'name': 'b.docx'},
+    ]
+    with (
+        patch('open_webui.services.sync.base_worker.Files.insert_new_files', new_callable=AsyncMock),
+        patch(
+            'open_webui.services.sync.base_worker.Knowledges.add_files_to_knowledge_by_ids',
+            new_callable=AsyncMock,
+            return_value=None,
+        ),
+        patch(
+            'open_webui.services.sync.base_worker.Knowledges.add_file_to_knowledge_by_id', new_callable=AsyncMock
+        ) as link_one,
+        patch('open_webui.services.sync.base_worker.emit_file_processing', new_callable=AsyncMock),
+    ):
+        await worker._create_stub_file_rows(files)
+
+    assert [c.args[1] for c in link_one.await_args_list] == ['stub-a', 'stub-b']
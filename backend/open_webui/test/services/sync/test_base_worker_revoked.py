@@ -71,6 +71,7 @@ class _StubWorker(BaseSyncWorker):
 
 def _make_worker():
     worker = _StubWorker.__new__(_StubWorker)
+    worker._reset_run_state()
     worker.knowledge_id = 'kb-test'
     worker.user_id = 'user-test'
     worker.sources = []
@@ -244,3 +245,88 @@ async def test_sync_via_pipeline_revoked_count_in_total_deleted():
     assert result['files_failed'] == 0
     # And does NOT appear in failed_files.
     assert all(f['filename'] != 'stub-revoked' for f in result['failed_files'])
+
+
+@pytest.mark.asyncio
+async def test_remove_files_from_kb_batches_and_cleans_only_orphans():
+    worker = _make_worker()
+    with (
+        patch(
+            'open_webui.services.sync.base_worker.Knowledges.remove_files_from_knowledge_by_ids',
+            new_callable=AsyncMock,
+        ) as mock_remove,
+        patch(
+            'open_webui.services.sync.base_worker.ASYNC_VECTOR_DB_CLIENT.delete',
+            new_callable=AsyncMock,
+        ) as mock_delete,
+        patch(
+            'open_webui.services.sync.base_worker.Knowledges.get_referenced_file_ids',
+            new=AsyncMock(return_value={'stub-b'}),
+        ),
+        patch(
+            'open_webui.services.sync.base_worker.DeletionService.delete_orphaned_files_batch',
+            new_callable=AsyncMock,
+        ) as mock_batch,
+    ):
+        removed = await worker._remove_files_from_kb(['stub-a', 'stub-b', 'stub-c'])
+
+    assert removed == 3
+    mock_remove.assert_awaited_once_with('kb-test', ['stub-a', 'stub-b', 'stub-c'])
+    assert mock_delete.await_count == 3
+    mock_batch.assert_awaited_once_with(['stub-a', 'stub-c'], force=True)
+
+
+@pytest.mark.asyncio
+async def test_kb_files_loaded_once_and_pruned_on_removal():
+    worker = _make_worker()
+    worker._kb_files = None
+    files = [SimpleNamespace(id='stub-a'), SimpleNamespace(id='stub-b')]
+    get_files = AsyncMock(return_value=files)
+    with (
+        patch('open_webui.services.sync.base_worker.Knowledges.get_files_by_id', new=get_files),
+        patch(
+            'open_webui.services.sync.base_worker.Knowledges.remove_files_from_knowledge_by_ids',
+            new_callable=AsyncMock,
+        ),
+        patch('open_webui.services.sync.base_worker.ASYNC_VECTOR_DB_CLIENT.delete', new_callable=AsyncMock),
+        patch(
+            'open_webui.services.sync.base_worker.Knowledges.get_referenced_file_ids',
+            new=AsyncMock(return_value=set()),
+        ),
+        patch(
+            'open_webui.services.sync.base_worker.DeletionService.delete_orphaned_files_batch',
+            new_callable=AsyncMock,
+        ),
+    ):
+        assert [f.id for f in await worker._get_kb_files()] == ['stub-a', 'stub-b']
+        await worker._remove_files_from_kb(['stub-a'])
+        assert [f.id for f in await worker._get_kb_files()] == ['stub-b']
+
+    get_files.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_other_kb_ids_skips_own_kb():
+    worker = _make_worker()
+    refs = [SimpleNamespace(knowledge_id=kb) for kb in ('kb-test', 'kb-x', 'kb-y')]
+    with patch(
+        'open_webui.services.sync.base_worker.Knowledges.get_knowledge_files_by_file_id',
+        new=AsyncMock(return_value=refs),
+    ):
+        assert await worker._get_other_kb_ids('stub-a') == ['kb-x', 'kb-y']
+
+
+def test_replace_file_vectors_swaps_each_kb_independently():
+    worker = _make_worker()
+    items = [{'id': 'v1', 'text': 't', 'vector': [0.1], 'metadata': {'file_id': 'stub-a'}}]
+    with patch('open_webui.services.sync.base_worker.VECTOR_DB_CLIENT') as vector_db:
+        vector_db.delete.side_effect = [None, RuntimeError('down')]
+        worker._replace_file_vectors(['kb-x', 'kb-y'], 'stub-a', items)
+
+    assert [c.kwargs['collection_name'] for c in vector_db.delete.call_args_list] == ['kb-x', 'kb-y']
+    # A failed delete skips that KB's insert (its old vectors stay) without
+    # affecting the others; inserted vectors get fresh ids.
+    (insert,) = vector_db.insert.call_args_list
+    assert insert.kwargs['collection_name'] == 'kb-x'
+    assert insert.kwargs['items'][0]['id'] != 'v1'
+    assert insert.kwargs['items'][0]['vector'] == [0.1]
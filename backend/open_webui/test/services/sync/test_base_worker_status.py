@@ -0,0 +1,263 @@
+"""Guards `_update_sync_status`'s persist throttling.
+
+Per-file 'syncing' ticks used to read + write knowledge meta on every
+file. Only ticks that cross a ~5% step (and terminal / error updates) now
+hit the DB; the Socket.IO progress event still fires for every tick.
+`_check_cancelled` likewise prefers the in-process cancel event over meta,
+and per-file events go through a queue drained in order while syncing.
+The legacy pipeline re-checks cancellation before admitting each file and
+reports failures in input order, whatever order the file tasks finish in.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from open_webui.services.sync import base_worker
+from open_webui.services.sync.base_worker import BaseSyncWorker, _LegacyRun
+from open_webui.services.sync.constants import FailedFile
+
+
+class _StubWorker(BaseSyncWorker):
+    meta_key = 'stub_sync'
+    file_id_prefix = 'stub-'
+    event_prefix = 'stub'
+    provider_slug = 'stub'
+    internal_request_path = '/internal/stub-sync'
+    max_files_config = 100
+    source_clear_delta_keys: list[str] = []
+
+    def _create_client(self):
+        return None
+
+    async def _close_client(self):
+        return None
+
+    def _is_supported_file(self, item):
+        return True
+
+    async def _collect_folder_files(self, source):
+        return [], 0
+
+    async def _collect_single_file(self, source):
+        return None
+
+    async def _download_file_content(self, file_info):
+        return b''
+
+    def _get_provider_storage_headers(self, item_id):
+        return {}
+
+    def _get_provider_file_meta(self, **kwargs):
+        return {}
+
+    async def _sync_permissions(self):
+        return None
+
+    def _get_cloud_hash(self, file_info):
+        return None
+
+    async def _verify_source_access(self, source):
+        return True
+
+    async def _handle_revoked_source(self, source):
+        return 0
+
+
+def _make_worker():
+    worker = _StubWorker.__new__(_StubWorker)
+    worker._reset_run_state()
+    worker.knowledge_id = 'kb-test'
+    worker.user_id = 'user-test'
+    worker.event_emitter = None
+    return worker
+
+
+@pytest.mark.parametrize(
+    'status, current, total, error, last, expected',
+    [
+        ('syncing', 0, 0, None, None, True),  # opening tick
+        ('syncing', 1, 100, None, None, True),  # first progress write
+        ('syncing', 5, 100, None, 4, True),  # crossed a total // 20 step
+        ('syncing', 7, 100, None, 5, False),
+        ('syncing', 12, 100, None, 8, True),  # coalesced ticks skipped 10
+        ('syncing', 100, 100, None, 99, True),  # last file
+        ('syncing', 7, 100, 'limit', 5, True),  # carries an error
+        ('completed', 7, 100, None, 5, True),
+    ],
+)
+def test_should_persist_progress(status, current, total, error, last, expected):
+    worker = _make_worker()
+    worker._persisted_progress = last
+    assert worker._should_persist_progress(status, current, total, error, None) is expected
+
+
+@pytest.mark.asyncio
+async def test_throttled_tick_skips_db_but_still_emits():
+    worker = _make_worker()
+    worker._persisted_progress = 5
+    get_kb = AsyncMock(return_value=SimpleNamespace(meta={}))
+    emit = AsyncMock()
+    with (
+        patch('open_webui.services.sync.base_worker.Knowledges.get_knowledge_by_id', new=get_kb),
+        patch('open_webui.services.sync.base_worker.Knowledges.update_knowledge_meta_by_id', new=AsyncMock()),
+        patch('open_webui.services.sync.base_worker.emit_sync_progress', new=emit),
+    ):
+        await worker._update_sync_status('syncing', 7, 100, 'a.docx')
+    get_kb.assert_not_awaited()
+    emit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_throttled_tick_after_cancel_is_dropped():
+    worker = _make_worker()
+    worker._persisted_progress = 5
+    worker._cancel_observed = True
+    emit = AsyncMock()
+    with patch('open_webui.services.sync.base_worker.emit_sync_progress', new=emit):
+        await worker._update_sync_status('syncing', 7, 100, 'a.docx')
+    emit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_check_cancelled_reads_in_process_event_without_db():
+    worker = _make_worker()
+    worker._cancel_event = asyncio.Event()
+    get_kb = AsyncMock(return_value=SimpleNamespace(meta={}))
+    with (
+        patch('open_webui.services.sync.base_worker.Knowledges.get_knowledge_by_id', new=get_kb),
+        patch.dict(base_worker._RUNNING_SYNCS, {'kb-test': worker._cancel_event}),
+    ):
+        assert await worker._check_cancelled() is False
+        assert await worker._check_cancelled() is False
+        assert base_worker.request_cancel('kb-test') is True
+        assert await worker._check_cancelled() is True
+    # First call polls meta; the second falls inside CANCEL_POLL_INTERVAL.
+    get_kb.assert_awaited_once()
+    assert base_worker.request_cancel('kb-test') is False
+
+
+@pytest.mark.asyncio
+async def test_save_sources_skips_write_when_unchanged():
+    worker = _make_worker()
+    worker.sources = [{'item_id': 'a', 'delta_link': 'd1'}]
+    worker._saved_sources_json = worker._sources_json()
+    get_kb = AsyncMock(return_value=SimpleNamespace(meta={'stub_sync': {}}))
+    update = AsyncMock(return_value=SimpleNamespace())
+    with (
+        patch('open_webui.services.sync.base_worker.Knowledges.get_knowledge_by_id', new=get_kb),
+        patch('open_webui.services.sync.base_worker.Knowledges.update_knowledge_meta_by_id', new=update),
+    ):
+        await worker._save_sources()
+        update.assert_not_awaited()
+
+        worker.sources[0]['delta_link'] = 'd2'
+        await worker._save_sources()
+        await worker._save_sources()
+
+    update.assert_awaited_once()
+    assert update.await_args.args[1]['stub_sync']['sources'][0]['delta_link'] == 'd2'
+
+
+@pytest.mark.asyncio
+async def test_terminal_status_persists_last_result_in_one_write():
+    worker = _make_worker()
+    get_kb = AsyncMock(return_value=SimpleNamespace(meta={'stub_sync': {'status': 'syncing'}}))
+    update = AsyncMock()
+    with (
+        patch('open_webui.services.sync.base_worker.Knowledges.get_knowledge_by_id', new=get_kb),
+        patch('open_webui.services.sync.base_worker.Knowledges.update_knowledge_meta_by_id', new=update),
+        patch('open_webui.services.sync.base_worker.emit_sync_progress', new=AsyncMock()),
+    ):
+        await worker._update_sync_status('completed', 3, 3, last_result={'files_processed': 3})
+
+    update.assert_awaited_once()
+    sync_info = update.await_args.args[1]['stub_sync']
+    assert sync_info['status'] == 'completed'
+    assert sync_info['last_result'] == {'files_processed': 3}
+    assert sync_info['last_sync_at']
+
+
+@pytest.mark.asyncio
+async def test_terminal_status_can_fold_in_sources():
+    worker = _make_worker()
+    worker.sources = [{'item_id': 'a', 'delta_link': 'd2'}]
+    worker._saved_sources_json = None
+    get_kb = AsyncMock(return_value=SimpleNamespace(meta={'stub_sync': {'sources': []}}))
+    update = AsyncMock(return_value=SimpleNamespace())
+    with (
+        patch('open_webui.services.sync.base_worker.Knowledges.get_knowledge_by_id', new=get_kb),
+        patch('open_webui.services.sync.base_worker.Knowledges.update_knowledge_meta_by_id', new=update),
+        patch('open_webui.services.sync.base_worker.emit_sync_progress', new=AsyncMock()),
+    ):
+        await worker._update_sync_status('completed', 1, 1, last_result={}, save_sources=True)
+        # Already persisted with the status — no second write.
+        await worker._save_sources()
+
+    update.assert_awaited_once()
+    assert update.await_args.args[1]['stub_sync']['sources'] == worker.sources
+
+
+@pytest.mark.asyncio
+async def test_emit_is_inline_without_queue():
+    worker = _make_worker()
+    emit_fn = AsyncMock()
+    await worker._emit(emit_fn, user_id='u', knowledge_id='kb', file_info={'name': 'a'})
+    emit_fn.assert_awaited_once_with('stub', user_id='u', knowledge_id='kb', file_info={'name': 'a'})
+
+
+@pytest.mark.asyncio
+async def test_queued_events_drain_in_order():
+    worker = _make_worker()
+    sent = []
+
+    async def emit_fn(prefix, **kwargs):
+        sent.append(kwargs['file_info']['name'])
+
+    worker._event_queue = asyncio.Queue()
+    drain = asyncio.create_task(worker._drain_events(worker._event_queue))
+    for name in ('a', 'b', 'c'):
+        await worker._emit(emit_fn, file_info={'name': name})
+    worker._event_queue.put_nowait(None)
+    await drain
+
+    assert sent == ['a', 'b', 'c']
+
+
+@pytest.mark.asyncio
+async def test_admission_stops_on_cancel_written_elsewhere():
+    worker = _make_worker()
+    # The in-process event never fires; the cancel only shows up in meta.
+    worker._check_cancelled = AsyncMock(side_effect=[False, True])
+    worker._run_pipeline_file = AsyncMock(return_value=None)
+    run = _LegacyRun(total_files=3)
+
+    await worker._admit_files(run, [{'name': 'a'}, {'name': 'b'}, {'name': 'c'}], max_in_flight=3)
+
+    assert run.cancelled is True
+    worker._run_pipeline_file.assert_awaited_once_with(run, {'name': 'a'})
+
+
+@pytest.mark.asyncio
+async def test_failed_files_keep_input_order():
+    worker = _make_worker()
+    worker._check_cancelled = AsyncMock(return_value=False)
+    finished = []
+
+    async def _fail_after(run, file_info):
+        await asyncio.sleep(file_info['delay'])
+        finished.append(file_info['name'])
+        return FailedFile(filename=file_info['name'], error_type='processing_error', error_message='boom')
+
+    worker._run_pipeline_file = _fail_after
+    files = [{'name': 'a', 'delay': 0.03}, {'name': 'b', 'delay': 0.02}, {'name': 'c', 'delay': 0.01}]
+    run = _LegacyRun(total_files=3)
+
+    await worker._admit_files(run, files, max_in_flight=3)
+
+    assert finished == ['c', 'b', 'a']
+    assert [f.filename for f in run.failed_files()] == ['a', 'b', 'c']
@@ -0,0 +1,72 @@
+"""Guards the single-flight token refresh in `get_valid_access_token`.
+
+Providers rotate refresh tokens, so concurrent refreshes for the same user
+would invalidate each other. Callers that arrive while a refresh is in flight
+must await it instead of starting their own, and a caller holding a session
+read before an earlier refresh finished must not refresh again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from open_webui.services.sync import token_refresh
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_refresh():
+    session = SimpleNamespace(id='sess-1', token={'access_token': 'old', 'expires_at': 0})
+    release = asyncio.Event()
+    calls = 0
+
+    async def refresh_fn(token_data):
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {'access_token': 'new', 'expires_at': 10**10}
+
+    with (
+        patch.object(
+            token_refresh.OAuthSessions, 'get_session_by_provider_and_user_id', new=AsyncMock(return_value=session)
+        ),
+        patch.object(token_refresh.OAuthSessions, 'update_session_by_id', new_callable=AsyncMock) as update,
+    ):
+        callers = [
+            asyncio.create_task(
+                token_refresh.get_valid_access_token('onedrive', 'onedrive_sync', 'user-1', f'kb-{n}', refresh_fn)
+            )
+            for n in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        tokens = await asyncio.gather(*callers)
+
+    assert tokens == ['new', 'new', 'new']
+    assert calls == 1
+    update.assert_awaited_once()
+    assert token_refresh._INFLIGHT_REFRESHES == {}
+
+
+@pytest.mark.asyncio
+async def test_stale_caller_reuses_token_refreshed_after_its_read():
+    stale = SimpleNamespace(id='sess-1', token={'access_token': 'old', 'refresh_token': 'spent', 'expires_at': 0})
+    fresh = SimpleNamespace(id='sess-1', token={'access_token': 'new', 'expires_at': 10**10})
+    refresh_fn = AsyncMock()
+
+    with (
+        patch.object(
+            token_refresh.OAuthSessions,
+            'get_session_by_provider_and_user_id',
+            new=AsyncMock(side_effect=[stale, fresh]),
+        ),
+        patch.object(token_refresh.OAuthSessions, 'update_session_by_id', new_callable=AsyncMock) as update,
+    ):
+        token = await token_refresh.get_valid_access_token('onedrive', 'onedrive_sync', 'user-1', 'kb-1', refresh_fn)
+
+    assert token == 'new'
+    refresh_fn.assert_not_awaited()
+    update.assert_not_awaited()
@@ -199,6 +199,30 @@ async def test_cancel_job_uses_correct_url(monkeypatch):
     assert cancel_recorder.requests[0].method == 'POST'
 
 
+@pytest.mark.asyncio
+async def test_requests_share_one_async_client_until_close(status_recorder, monkeypatch):
+    transport = httpx.MockTransport(status_recorder)
+    real_async_client = httpx.AsyncClient
+    created = []
+
+    def make_async_client(*args, **kwargs):
+        kwargs['transport'] = transport
+        created.append(real_async_client(*args, **kwargs))
+        return created[-1]
+
+    monkeypatch.setattr('open_webui.services.sync.pipeline_client.httpx.AsyncClient', make_async_client)
+
+    client = PipelineClient(base_url='http://lw', tenant='tenant-x')
+    await client.get_status('job-1')
+    await client.get_status('job-1')
+    assert len(created) == 1
+
+    await client.close()
+    assert created[0].is_closed
+    await client.get_status('job-1')
+    assert len(created) == 2
+
+
 # ---------- BaseSyncWorker branches --------------------------------------------------
 
 
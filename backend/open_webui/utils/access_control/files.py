@@ -42,16 +42,17 @@ async def has_access_to_file(
     # Check if the file is associated with any knowledge bases the user has access to
     knowledge_bases = await Knowledges.get_knowledges_by_file_id(file_id, db=db)
     user_group_ids = {group.id for group in await Groups.get_groups_by_member_id(user.id, db=db)}
-    for knowledge_base in knowledge_bases:
-        if knowledge_base.user_id == user.id or await AccessGrants.has_access(
-            user_id=user.id,
-            resource_type='knowledge',
-            resource_id=knowledge_base.id,
-            permission=access_type,
-            user_group_ids=user_group_ids,
-            db=db,
-        ):
-            return True
+    if any(knowledge_base.user_id == user.id for knowledge_base in knowledge_bases):
+        return True
+    if await AccessGrants.get_accessible_resource_ids(
+        user_id=user.id,
+        resource_type='knowledge',
+        resource_ids=[knowledge_base.id for knowledge_base in knowledge_bases],
+        permission=access_type,
+        user_group_ids=user_group_ids,
+        db=db,
+    ):
+        return True
 
     knowledge_base_id = file.meta.get('collection_name') if file.meta else None
     if knowledge_base_id: